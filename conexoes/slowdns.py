@@ -42,12 +42,20 @@ scripts such as ``install``, ``slowdns``, ``slowdns-ssh`` and the
 import os
 import sys
 import time
-import json
 import shutil
 import subprocess
 from pathlib import Path
 from typing import Optional
 
+# Adiciona o diretório pai ao sys.path para reutilizar os utilitários de menu
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from menus.menu_style_utils import clear_screen
+except ImportError:
+    print("Erro: Módulo de estilo não encontrado.")
+    sys.exit(1)
+
 # --- Constantes de Cores para o Menu ---
 C_HEADER = '\033[95m'
 C_BLUE = '\033[94m'
@@ -492,10 +500,6 @@ class DNSAGNManager:
         This function emulates the original bash ``slowdns`` menu
         script, but with an improved visual appearance.
         """
-        
-        def clear_screen():
-            # Limpa a tela do console
-            os.system('cls' if os.name == 'nt' else 'clear')
 
         while True:
             clear_screen()
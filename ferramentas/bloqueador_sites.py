@@ -3,7 +3,6 @@
 
 import os
 import subprocess
-import sys
 
 # --- Constantes ---
 HOSTS_FILE = "/etc/hosts"
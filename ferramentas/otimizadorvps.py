@@ -3,15 +3,19 @@
 import os
 import sys
 import subprocess
-import shutil
+
+# Adiciona o diretório pai ao sys.path para reutilizar os utilitários de menu
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from menus.menu_style_utils import clear_screen
+except ImportError:
+    print("Erro: Módulo de estilo não encontrado.")
+    sys.exit(1)
 
 # Arquivo onde os cron jobs serão salvos para fácil gerenciamento
 CRON_FILE_PATH = "/etc/cron.d/vps_optimizer_tasks"
 
-def clear_screen():
-    """Limpa a tela do terminal."""
-    os.system('cls' if os.name == 'nt' else 'clear')
-
 def check_root():
     """Verifica se o script está sendo executado como root."""
     if os.geteuid() != 0:
@@ -21,10 +21,15 @@ class UploadDownloadHandler(http.server.SimpleHTTPRequestHandler):
 
     def _get_current_file(self):
         """Retorna o nome do primeiro arquivo encontrado no diretório."""
-        if not os.path.exists(DOWNLOAD_DIR):
-            os.makedirs(DOWNLOAD_DIR)
-        files = [f for f in os.listdir(DOWNLOAD_DIR) if os.path.isfile(os.path.join(DOWNLOAD_DIR, f))]
-        return files[0] if files else None
+        # Para no primeiro arquivo regular, sem listar o diretório inteiro
+        try:
+            with os.scandir(DOWNLOAD_DIR) as it:
+                for entry in it:
+                    if entry.is_file():
+                        return entry.name
+        except FileNotFoundError:
+            os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+        return None
 
     def _html_template(self, title, body_content, status_message=""):
         """Gera o template HTML base para as páginas."""
@@ -160,8 +165,9 @@ class UploadDownloadHandler(http.server.SimpleHTTPRequestHandler):
             filename = os.path.basename(file_item.filename)
             
             # Limpa o diretório antes de salvar o novo arquivo
-            for f in os.listdir(DOWNLOAD_DIR):
-                os.remove(os.path.join(DOWNLOAD_DIR, f))
+            with os.scandir(DOWNLOAD_DIR) as it:
+                for entry in it:
+                    os.remove(entry.path)
 
             # Salva o novo arquivo
             filepath = os.path.join(DOWNLOAD_DIR, filename)
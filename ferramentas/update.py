@@ -41,16 +41,19 @@ def ask_for_confirmation(force: bool) -> bool:
 
 def perform_cleanup(whitelist: List[str]) -> None:
     print("\nIniciando limpeza do diretório…")
-    for item in os.listdir('.'):
-        if item not in whitelist:
-            try:
-                if os.path.isdir(item):
-                    shutil.rmtree(item)
-                else:
-                    os.remove(item)
-                print(f"  {Cores.VERDE}[OK]{Cores.FIM} Removido: {item}")
-            except OSError as e:
-                print(f"  {Cores.VERMELHO}[ERRO]{Cores.FIM} Falha ao remover {item}: {e}")
+    # scandir já traz o tipo de cada entrada; is_dir() segue links como os.path.isdir
+    with os.scandir('.') as it:
+        entries = [e for e in it if e.name not in whitelist]
+    for entry in entries:
+        item = entry.name
+        try:
+            if entry.is_dir():
+                shutil.rmtree(item)
+            else:
+                os.remove(item)
+            print(f"  {Cores.VERDE}[OK]{Cores.FIM} Removido: {item}")
+        except OSError as e:
+            print(f"  {Cores.VERMELHO}[ERRO]{Cores.FIM} Falha ao remover {item}: {e}")
     print("Limpeza concluída.\n")
 
 def run_installation(script_path: str) -> None:
@@ -6,7 +6,7 @@ import os
 import sys
 import time
 import psutil  # Adicionar: pip install psutil
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import defaultdict
 
 # Path setup
@@ -154,12 +154,9 @@ class RealTimeMonitor:
     def verify_connection_alive(self, pid):
         """Verifica se uma conexão específica ainda está ativa"""
         try:
-            # Verifica se o processo existe
-            if not psutil.pid_exists(pid):
-                return False
-            
-            # Verifica se o processo ainda é sshd
+            # Process() já falha se o PID não existe: dispensa o pid_exists antes
             proc = psutil.Process(pid)
+            # Verifica se o processo ainda é sshd
             if 'sshd' not in proc.name():
                 return False
             
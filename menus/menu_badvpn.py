@@ -13,6 +13,7 @@ executado normalmente.
 
 import os
 import sys
+import functools
 import subprocess
 import re
 import shutil
@@ -31,6 +32,21 @@ except ImportError as e:
     sys.exit(1)
 
 
+# Caminho absoluto do bash, resolvido uma vez
+BASH = shutil.which('bash') or '/bin/bash'
+
+# Textos de status com as cores já aplicadas; os variáveis são preenchidos via .format
+_SVC_NOT_INSTALLED = f"{MC.YELLOW_GRADIENT}{Icons.WARNING} Não Instalado{MC.RESET}"
+_SVC_ACTIVE = f"{MC.GREEN_GRADIENT}{Icons.ACTIVE} Ativo{MC.RESET}"
+_SVC_INACTIVE = f"{MC.RED_GRADIENT}{Icons.INACTIVE} Inativo{MC.RESET}"
+_SVC_ERROR = f"{MC.RED_GRADIENT}{Icons.CROSS} Erro{MC.RESET}"
+_BBR_ACTIVE = f"{MC.GREEN_GRADIENT}{Icons.ACTIVE} BBR Ativo{MC.RESET}"
+_BBR_INACTIVE_TMPL = f"{MC.YELLOW_GRADIENT}{Icons.INACTIVE} BBR Inativo ({{algo}}){MC.RESET}"
+_SERVICE_LINE_TMPL = f"{MC.CYAN_LIGHT}{Icons.SERVER} Serviço:{MC.RESET} {{status}}"
+_PORT_LINE_TMPL = f"{MC.CYAN_LIGHT}{Icons.NETWORK} Porta:{MC.RESET} {MC.WHITE}{{port}}{MC.RESET}"
+_BBR_LINE_TMPL = f"{MC.CYAN_LIGHT}{Icons.ROCKET} Otimização:{MC.RESET} {{bbr}}"
+
+
 # ==================== GERENCIADOR BADVPN ====================
 class BadVPNManager:
     def __init__(self):
@@ -47,17 +63,13 @@ class BadVPNManager:
     def get_status(self):
         """Retorna status formatado do BadVPN e porta configurada."""
         if not self.is_installed():
-            return f"{MC.YELLOW_GRADIENT}{Icons.WARNING} Não Instalado{MC.RESET}", "N/A"
+            return _SVC_NOT_INSTALLED, "N/A"
         try:
             result = subprocess.run(
                 ["systemctl", "is-active", "badvpn-udpgw"],
                 capture_output=True, text=True, check=False
             )
-            status = (
-                f"{MC.GREEN_GRADIENT}{Icons.ACTIVE} Ativo{MC.RESET}"
-                if result.stdout.strip() == "active"
-                else f"{MC.RED_GRADIENT}{Icons.INACTIVE} Inativo{MC.RESET}"
-            )
+            status = _SVC_ACTIVE if result.stdout.strip() == "active" else _SVC_INACTIVE
             port = "7300"
             with self.service_file.open('r') as f:
                 content = f.read()
@@ -67,14 +79,14 @@ class BadVPNManager:
             return status, port
         except Exception as e:
             print(f"Erro ao obter status: {e}", file=sys.stderr)
-            return f"{MC.RED_GRADIENT}{Icons.CROSS} Erro{MC.RESET}", "N/A"
+            return _SVC_ERROR, "N/A"
 
     def get_bbr_status(self):
         """Retorna status do BBR (algoritmo de congestionamento)."""
         bbr = bbr_manager.check_status()
         if bbr == 'bbr':
-            return f"{MC.GREEN_GRADIENT}{Icons.ACTIVE} BBR Ativo{MC.RESET}"
-        return f"{MC.YELLOW_GRADIENT}{Icons.INACTIVE} BBR Inativo ({bbr}){MC.RESET}"
+            return _BBR_ACTIVE
+        return _BBR_INACTIVE_TMPL.format(algo=bbr)
 
     def uninstall(self):
         """Desinstala o BadVPN completamente do sistema."""
@@ -143,34 +155,62 @@ class BadVPNManager:
 
 
 # ==================== FRAMES ====================
+# Último frame principal montado e a chave (estado + largura) que o gerou
+_MAIN_FRAME_CACHE = {"key": None, "frame": None}
+
+
 def build_main_frame(manager: BadVPNManager, status_msg: str = "") -> str:
-    """Frame principal do BadVPN."""
-    s = []
-    s.append(simple_header("GERENCIADOR BADVPN"))
+    """Frame principal do BadVPN (reaproveitado se nada mudou)."""
     service_status, port = manager.get_status()
     bbr_status = manager.get_bbr_status()
+    installed = manager.is_installed()
+    key = (service_status, port, bbr_status, installed, status_msg, TerminalManager.size()[0])
+    if key != _MAIN_FRAME_CACHE["key"]:
+        _MAIN_FRAME_CACHE["frame"] = _render_main_frame(service_status, port, bbr_status, installed, status_msg)
+        _MAIN_FRAME_CACHE["key"] = key
+    return _MAIN_FRAME_CACHE["frame"]
+
+
+@functools.lru_cache(maxsize=4)
+def _main_static_parts(cols: int):
+    """Trechos fixos do frame principal, que só dependem da largura do terminal."""
+    header = simple_header("GERENCIADOR BADVPN")
+    options_box = "".join([
+        "\n",
+        modern_box("OPÇÕES DISPONÍVEIS", [], Icons.SETTINGS, MC.BLUE_GRADIENT, MC.BLUE_LIGHT),
+        "\n",
+    ])
+    installed_opts = "".join([
+        menu_option("1", "Alterar Porta", Icons.EDIT, MC.CYAN_GRADIENT),
+        menu_option("2", "Iniciar Serviço", Icons.ACTIVE, MC.GREEN_GRADIENT),
+        menu_option("3", "Parar Serviço", Icons.INACTIVE, MC.RED_GRADIENT),
+        menu_option("4", "Reiniciar Serviço", Icons.UPDATE, MC.YELLOW_GRADIENT),
+        menu_option("6", "Remover BadVPN", Icons.TRASH, MC.RED_GRADIENT, badge="PERIGO"),
+    ])
+    install_opt = menu_option("1", "Instalar BadVPN", Icons.DOWNLOAD, MC.GREEN_GRADIENT, badge="NECESSÁRIO")
+    tail = "".join([
+        menu_option("5", "Gerenciar BBR", Icons.ROCKET, MC.PURPLE_GRADIENT),
+        "\n",
+        menu_option("0", "Voltar", Icons.BACK, MC.YELLOW_GRADIENT),
+    ])
+    return header, options_box, installed_opts, install_opt, tail
+
+
+def _render_main_frame(service_status: str, port: str, bbr_status: str, installed: bool, status_msg: str) -> str:
+    header, options_box, installed_opts, install_opt, tail = _main_static_parts(TerminalManager.size()[0])
     status_lines = [
-        f"{MC.CYAN_LIGHT}{Icons.SERVER} Serviço:{MC.RESET} {service_status}",
-        f"{MC.CYAN_LIGHT}{Icons.NETWORK} Porta:{MC.RESET} {MC.WHITE}{port}{MC.RESET}",
-        f"{MC.CYAN_LIGHT}{Icons.ROCKET} Otimização:{MC.RESET} {bbr_status}"
+        _SERVICE_LINE_TMPL.format(status=service_status),
+        _PORT_LINE_TMPL.format(port=port),
+        _BBR_LINE_TMPL.format(bbr=bbr_status),
     ]
-    s.append(modern_box("STATUS DO SISTEMA", status_lines, Icons.CHART, MC.PURPLE_GRADIENT, MC.PURPLE_LIGHT))
-    s.append("\n")
-    s.append(modern_box("OPÇÕES DISPONÍVEIS", [], Icons.SETTINGS, MC.BLUE_GRADIENT, MC.BLUE_LIGHT))
-    s.append("\n")
-    if manager.is_installed():
-        s.append(menu_option("1", "Alterar Porta", Icons.EDIT, MC.CYAN_GRADIENT))
-        s.append(menu_option("2", "Iniciar Serviço", Icons.ACTIVE, MC.GREEN_GRADIENT))
-        s.append(menu_option("3", "Parar Serviço", Icons.INACTIVE, MC.RED_GRADIENT))
-        s.append(menu_option("4", "Reiniciar Serviço", Icons.UPDATE, MC.YELLOW_GRADIENT))
-        s.append(menu_option("6", "Remover BadVPN", Icons.TRASH, MC.RED_GRADIENT, badge="PERIGO"))
-    else:
-        s.append(menu_option("1", "Instalar BadVPN", Icons.DOWNLOAD, MC.GREEN_GRADIENT, badge="NECESSÁRIO"))
-    s.append(menu_option("5", "Gerenciar BBR", Icons.ROCKET, MC.PURPLE_GRADIENT))
-    s.append("\n")
-    s.append(menu_option("0", "Voltar", Icons.BACK, MC.YELLOW_GRADIENT))
-    s.append(footer_line(status_msg))
-    return "".join(s)
+    return "".join([
+        header,
+        modern_box("STATUS DO SISTEMA", status_lines, Icons.CHART, MC.PURPLE_GRADIENT, MC.PURPLE_LIGHT),
+        options_box,
+        installed_opts if installed else install_opt,
+        tail,
+        footer_line(status_msg),
+    ])
 
 
 def build_bbr_frame(status_msg: str = "") -> str:
@@ -241,13 +281,13 @@ def main_menu() -> None:
         while True:
             TerminalManager.render(build_main_frame(manager, status))
             TerminalManager.before_input()
-            choice = input(f"\n{MC.PURPLE_GRADIENT}{MC.BOLD}└─ Escolha uma opção: {MC.RESET}").strip()
+            choice = TerminalManager.read_key(f"\n{MC.PURPLE_GRADIENT}{MC.BOLD}└─ Escolha uma opção: {MC.RESET}")
             TerminalManager.after_input()
 
             if choice == "1":
                 # Instalar ou alterar porta
                 TerminalManager.before_input()
-                port = input(f"\n{MC.CYAN_GRADIENT}Digite a porta (ex: 7300): {MC.RESET}").strip()
+                port = TerminalManager.read_line(f"\n{MC.CYAN_GRADIENT}Digite a porta (ex: 7300): {MC.RESET}")
                 TerminalManager.after_input()
                 if port.isdigit() and 1 <= int(port) <= 65535:
                     TerminalManager.render(build_operation_frame("install" if not manager.is_installed() else "port", port))
@@ -255,7 +295,7 @@ def main_menu() -> None:
                     try:
                         if not manager.is_installed():
                             # Chama o script de instalação original
-                            subprocess.run(['bash', str(manager.install_script), port], check=True)
+                            subprocess.run([BASH, str(manager.install_script), port], check=True)
                             status = f"BadVPN instalado e porta configurada: {port}"
                         else:
                             # Altera apenas a porta
@@ -305,7 +345,7 @@ def main_menu() -> None:
                 while True:
                     TerminalManager.render(build_bbr_frame(bbr_status))
                     TerminalManager.before_input()
-                    bbr_choice = input(f"\n{MC.PURPLE_GRADIENT}{MC.BOLD}└─ Escolha: {MC.RESET}").strip()
+                    bbr_choice = TerminalManager.read_key(f"\n{MC.PURPLE_GRADIENT}{MC.BOLD}└─ Escolha: {MC.RESET}")
                     TerminalManager.after_input()
                     if bbr_choice == "1":
                         success, msg = bbr_manager.enable()
@@ -322,7 +362,7 @@ def main_menu() -> None:
             elif choice == "6" and manager.is_installed():
                 # Remover BadVPN
                 TerminalManager.before_input()
-                confirm = input(f"\n{MC.RED_GRADIENT}{Icons.WARNING} Tem certeza que deseja remover o BadVPN? (s/N): {MC.RESET}").strip().lower()
+                confirm = TerminalManager.read_line(f"\n{MC.RED_GRADIENT}{Icons.WARNING} Tem certeza que deseja remover o BadVPN? (s/N): {MC.RESET}").lower()
                 TerminalManager.after_input()
                 if confirm == 's':
                     TerminalManager.render(build_operation_frame("uninstall"))
@@ -341,6 +381,8 @@ def main_menu() -> None:
     except KeyboardInterrupt:
         status = "Operação cancelada"
     finally:
+        # Não deixa o Enter da última escolha vazar para o menu que nos chamou
+        TerminalManager.discard_input()
         TerminalManager.leave_alt_screen()
 
 
@@ -3,7 +3,6 @@
 
 import os
 import sys
-import time
 
 # Adiciona o diretório pai ao sys.path para permitir importações de outros módulos do projeto
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,7 +14,7 @@ except ImportError as e:
     print(f"Erro de importação: {e}. Verifique se todos os arquivos do projeto estão nos diretórios corretos.")
     sys.exit(1)
 
-COLORS = Colors()
+COLORS = Colors
 
 def show_dns_status():
     """Exibe o status atual do filtro DNS de forma clara."""
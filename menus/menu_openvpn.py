@@ -10,15 +10,21 @@
 
 import os
 import sys
+import functools
 import subprocess
 import time
 import re
+import shlex
+import stat
+import platform
+import mmap
+import socket
 import threading
 import http.server
-import socketserver
+import urllib.request
 from pathlib import Path
-from shutil import copyfile
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from shutil import copyfile, which
 
 # Ajuste o path para importar utilitários visuais
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -26,7 +32,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     # Paleta de cores e componentes de UI reutilizados
     from menus.menu_style_utils import (
-        MC, Icons, TerminalManager,
+        MC, TerminalManager,
         modern_box, menu_option, footer_line, simple_header
     )
 except ImportError as e:
@@ -38,22 +44,88 @@ except ImportError as e:
 # --------------------------------------------------------------------
 DOWNLOAD_SERVER = None          # Instância do servidor TCP
 DOWNLOAD_THREAD = None          # Thread que roda o servidor
+DOWNLOAD_TIMER = None           # Timer que encerra o servidor ao fim do prazo
 DOWNLOAD_FILE_PATH = None       # Caminho do arquivo .ovpn a ser servido
-DOWNLOAD_START_TIME = None      # Data/hora de início do servidor de download
+DOWNLOAD_FILE_SIZE = None       # Tamanho do arquivo, medido ao iniciar o servidor
+DOWNLOAD_START_TIME = None      # Instante (time.monotonic) de início do servidor de download
 DOWNLOAD_PORT = 7777            # Porta onde o HTTP de download ficará ativo
 DOWNLOAD_DURATION = 600         # Duração em segundos (10 minutos)
+DOWNLOAD_POLL_INTERVAL = 5      # Intervalo (s) em que o servidor verifica pedidos de parada
+PUBLIC_IP_TTL = 600             # Validade (s) do IP público em cache
+MENU_REFRESH = 1.0              # Intervalo (s) de atualização do menu ocioso
+RESTART_SETTLE = 1.5            # Espera máxima (s) pelo OpenVPN abrir a porta após o restart
+CONF_IO_BUFFER = 128 * 1024     # Buffer de leitura/escrita dos arquivos .conf/.ovpn
+BASH = which('bash') or '/bin/bash'  # Caminho absoluto: dispensa a busca no PATH a cada exec
+
+_IP_CACHE = {"ip": None, "exp": 0.0}  # Último IP público detectado
+PUBLIC_IP_SERVICES = (
+    "https://api.ipify.org",
+    "https://ifconfig.me/ip",
+    "https://ipinfo.io/ip",
+)
+
+# Cabeçalho dos perfis .ovpn gerados; certificados e chaves vêm em seguida
+OVPN_CLIENT_TEMPLATE = """# OpenVPN Client Configuration
+client
+dev tun
+proto {proto}
+remote {ip} {port}
+resolv-retry infinite
+nobind
+persist-key
+persist-tun
+remote-cert-tls server
+auth SHA512
+cipher AES-256-GCM
+verb 3
+mute 20
+tun-mtu 1500
+mssfix 1420
+sndbuf 0
+rcvbuf 0
+tls-version-min 1.2
+
+"""
+
+# Rótulos dos provedores DNS conhecidos, indexados pelo conjunto de IPs
+_DNS_LABELS = {
+    frozenset({"8.8.8.8", "8.8.4.4"}): "google",
+    frozenset({"1.1.1.1", "1.0.0.1"}): "cloudflare",
+    frozenset({"9.9.9.9", "149.112.112.112"}): "quad9",
+    frozenset({"208.67.222.222", "208.67.220.220"}): "opendns",
+}
+
+# Diretivas lidas do server.conf (port, proto e push de DNS) em uma só varredura
+_CONF_RE_BYTES = re.compile(
+    rb'^[ \t]*(?:port[ \t]+(?P<port>\d+)(?=\s|$)'
+    rb'|proto[ \t]+(?P<proto>\S+)'
+    rb'|push[ \t]+"dhcp-option[ \t]+DNS[ \t]+(?P<dns>\d{1,3}(?:\.\d{1,3}){3}))',
+    re.M | re.I,
+)
+
+# Regex pré-compiladas usadas na edição do server.conf e dos .ovpn dos clientes
+_RE_PORT = re.compile(r'^\s*port\s+\d+', re.M)
+_RE_PROTO = re.compile(r'^\s*proto\s+\w+', re.M)
+_RE_DNS_PUSH = re.compile(r'^[ \t]*push\s+"dhcp-option\s+DNS\s+[0-9.]+"[ \t]*(?:\n|$)', re.M)
+_RE_REDIRECT_GW = re.compile(r'^[ \t]*push\s+"redirect-gateway.*$', re.M)
+_RE_CLIENT_PROTO = re.compile(r'^proto\s+\w+', re.M)
+_RE_REMOTE_PORT = re.compile(r'^(remote\s+\S+\s+)\d+(\b.*)$', re.M)
+_RE_FILTER_TABLE = re.compile(r'^\*filter\n.*?^COMMIT$', re.M | re.S)
+# Unidades openvpn.service e instâncias openvpn@X / openvpn-server@X em list-unit-files
+_RE_UNIT = re.compile(r'^(openvpn(?:-server)?(?:@\S+)?\.service)(?=\s|$)', re.M)
 
 # --------------------------------------------------------------------
 # Funções utilitárias
 # --------------------------------------------------------------------
-def run_cmd(cmd, timeout=8):
+def run_cmd(cmd, timeout=8, input=None):
     """Executa um comando no sistema com timeout e captura de saída.
 
     Retorna um objeto CompletedProcess sempre, mesmo em caso de exceção ou
     timeout. Esse wrapper evita levantar exceções e facilita o tratamento.
+    `input`, se informado, é enviado para a entrada padrão do comando.
     """
     try:
-        return subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=timeout)
+        return subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=timeout, input=input)
     except subprocess.TimeoutExpired:
         return subprocess.CompletedProcess(cmd, 124, "", "timeout")
     except Exception as e:
@@ -69,24 +141,70 @@ def ensure_root():
 def get_public_ip():
     """Tenta determinar o IP público da VPS consultando serviços externos.
 
-    Usa curl via run_cmd. Se os serviços externos falharem, retorna o IP
-    local retornado por `hostname -I`. Caso não seja possível descobrir,
-    retorna uma string indicando falha.
+    Se os serviços externos falharem, retorna o IP local da rota padrão.
+    Caso não seja possível descobrir, retorna uma string indicando falha.
+    O IP detectado fica em cache por PUBLIC_IP_TTL segundos.
+    """
+    now = time.monotonic()
+    if _IP_CACHE["ip"] and now < _IP_CACHE["exp"]:
+        return _IP_CACHE["ip"]
+    ip = _detect_public_ip()
+    if ip != "IP_NAO_DETECTADO":
+        _IP_CACHE["ip"] = ip
+        _IP_CACHE["exp"] = now + PUBLIC_IP_TTL
+    return ip
+
+def _detect_public_ip():
+    """Consulta o IP público sem cache (ver get_public_ip).
+
+    Faz a requisição HTTP no próprio processo (urllib) em vez de disparar
+    curl; respostas que não sejam um IPv4 válido são descartadas.
     """
-    # Serviço principal
-    ip_result = run_cmd(['curl', '-4', '-s', 'https://api.ipify.org'], timeout=5)
-    if ip_result.returncode == 0 and ip_result.stdout.strip():
-        return ip_result.stdout.strip()
-    # Fallbacks
-    for url in ['https://ifconfig.me', 'https://ipinfo.io/ip']:
-        ip_result = run_cmd(['curl', '-4', '-s', url], timeout=5)
-        if ip_result.returncode == 0 and ip_result.stdout.strip():
-            return ip_result.stdout.strip()
+    for url in PUBLIC_IP_SERVICES:
+        try:
+            with urllib.request.urlopen(url, timeout=3) as resp:
+                ip = resp.read(64).decode("ascii", "ignore").strip()
+        except Exception:
+            continue
+        if ipv4_re.fullmatch(ip):
+            return ip
     # Última alternativa: IP local
-    ip_result = run_cmd(['hostname', '-I'])
-    if ip_result.returncode == 0 and ip_result.stdout.strip():
-        return ip_result.stdout.split()[0]
-    return "IP_NAO_DETECTADO"
+    return _local_ip() or "IP_NAO_DETECTADO"
+
+def _local_ip():
+    """Retorna o IP da interface de saída padrão, ou None.
+
+    Um connect() UDP não envia pacotes; só faz o kernel escolher a rota.
+    """
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("8.8.8.8", 80))
+        return s.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        s.close()
+
+def _proc_bound(port, proto):
+    """Retorna True se há socket local na porta, lendo /proc/net sem conectar.
+
+    Para TCP só conta socket em LISTEN (estado 0A); para UDP, qualquer
+    socket ligado à porta. Vale para qualquer endereço local.
+    """
+    suffix = f":{int(port):04X}"
+    tcp = proto.startswith("tcp")
+    tables = ("/proc/net/tcp", "/proc/net/tcp6") if tcp else ("/proc/net/udp", "/proc/net/udp6")
+    for table in tables:
+        try:
+            with open(table) as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split(None, 4)
+                    if len(fields) > 3 and fields[1].endswith(suffix) and (not tcp or fields[3] == "0A"):
+                        return True
+        except OSError:
+            continue
+    return False
 
 # --------------------------------------------------------------------
 # Servidor HTTP temporário para servir arquivos .ovpn
@@ -96,32 +214,55 @@ class SingleFileHTTPHandler(http.server.SimpleHTTPRequestHandler):
 
     def do_GET(self):
         """Retorna o arquivo OVPN se a rota corresponder."""
-        global DOWNLOAD_FILE_PATH
-        if not DOWNLOAD_FILE_PATH or not os.path.exists(DOWNLOAD_FILE_PATH):
+        path = DOWNLOAD_FILE_PATH
+        if not path:
             self.send_error(404, "Arquivo não encontrado")
             return
+        name = os.path.basename(path)
         # Permite acesso pela raiz '/' ou nome do arquivo
-        if self.path in ('/', f'/{os.path.basename(DOWNLOAD_FILE_PATH)}'):
+        if self.path not in ('/', f'/{name}'):
+            self.send_error(404, "Arquivo não encontrado")
+            return
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            self.send_error(404, "Arquivo não encontrado")
+            return
+        except OSError:
+            self.send_error(500, "Erro interno do servidor")
+            return
+        with f:
             try:
+                # Tamanho medido em start_download_server; fstat só se faltar
+                length = DOWNLOAD_FILE_SIZE
+                if length is None:
+                    length = os.fstat(f.fileno()).st_size
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/x-openvpn-profile')
-                self.send_header('Content-Disposition', f'attachment; filename="{os.path.basename(DOWNLOAD_FILE_PATH)}"')
-                self.send_header('Content-Length', str(os.path.getsize(DOWNLOAD_FILE_PATH)))
+                self.send_header('Content-Disposition', f'attachment; filename="{name}"')
+                self.send_header('Content-Length', str(length))
                 self.end_headers()
-                with open(DOWNLOAD_FILE_PATH, 'rb') as f:
-                    self.wfile.write(f.read())
+                self.wfile.flush()
+                # socket.sendfile usa os.sendfile (zero-copy) quando disponível
+                # e recorre a send() nas plataformas sem suporte
+                self.connection.sendfile(f, 0, length)
             except Exception:
                 self.send_error(500, "Erro interno do servidor")
-        else:
-            self.send_error(404, "Arquivo não encontrado")
 
     def log_message(self, format, *args):
         """Suprime mensagens de log padrão do HTTP para limpar a saída."""
         pass
 
-class ReusableTCPServer(socketserver.TCPServer):
-    """TCPServer que permite reuso de porta antes do bind."""
+class ReusableHTTPServer(http.server.ThreadingHTTPServer):
+    """Servidor HTTP multi-thread que permite reuso de endereço e porta."""
     allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128
+
+    def server_bind(self):
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
 
 def start_download_server(file_path):
     """Inicia o servidor HTTP em background para servir o arquivo fornecido.
@@ -129,26 +270,43 @@ def start_download_server(file_path):
     Cria uma thread que escuta na porta DOWNLOAD_PORT por DOWNLOAD_DURATION
     segundos. Configura regra de firewall apenas se ainda não existir.
     """
-    global DOWNLOAD_SERVER, DOWNLOAD_THREAD, DOWNLOAD_FILE_PATH, DOWNLOAD_START_TIME
+    global DOWNLOAD_SERVER, DOWNLOAD_THREAD, DOWNLOAD_FILE_PATH, DOWNLOAD_FILE_SIZE, DOWNLOAD_START_TIME
     # Encerra qualquer servidor em execução
     stop_download_server()
     DOWNLOAD_FILE_PATH = file_path
-    DOWNLOAD_START_TIME = datetime.now()
+    # O arquivo não muda durante a janela de download: mede uma vez só
+    try:
+        DOWNLOAD_FILE_SIZE = os.path.getsize(file_path)
+    except OSError:
+        DOWNLOAD_FILE_SIZE = None
+    DOWNLOAD_START_TIME = time.monotonic()
+    # Sinalizado pela thread assim que o socket está em escuta (ou falhou)
+    ready = threading.Event()
     def run_server():
-        global DOWNLOAD_SERVER
+        global DOWNLOAD_SERVER, DOWNLOAD_TIMER
         try:
             handler = SingleFileHTTPHandler
-            DOWNLOAD_SERVER = ReusableTCPServer(("0.0.0.0", DOWNLOAD_PORT), handler)
-            end_time = time.time() + DOWNLOAD_DURATION
-            DOWNLOAD_SERVER.timeout = 1
-            while time.time() < end_time:
-                DOWNLOAD_SERVER.handle_request()
-            stop_download_server()
+            try:
+                server = ReusableHTTPServer(("0.0.0.0", DOWNLOAD_PORT), handler)
+                DOWNLOAD_SERVER = server
+            finally:
+                ready.set()
+            # Encerra o servidor ao fim de DOWNLOAD_DURATION sem polling por segundo
+            timer = threading.Timer(DOWNLOAD_DURATION, server.shutdown)
+            timer.daemon = True
+            DOWNLOAD_TIMER = timer
+            timer.start()
+            server.serve_forever(poll_interval=DOWNLOAD_POLL_INTERVAL)
+            if DOWNLOAD_SERVER is server:
+                stop_download_server()
         except Exception:
             pass
     DOWNLOAD_THREAD = threading.Thread(target=run_server, daemon=True)
     DOWNLOAD_THREAD.start()
-    time.sleep(0.5)
+    # Só mexe no firewall se o servidor realmente subiu na porta: a thread
+    # sinaliza `ready` e só publica DOWNLOAD_SERVER se o bind deu certo
+    if not ready.wait(timeout=2.0) or DOWNLOAD_SERVER is None:
+        return
     # Ajusta firewall se necessário: cria regra apenas se ela não existir
     check_rule = run_cmd(['iptables', '-C', 'INPUT', '-p', 'tcp', '--dport', str(DOWNLOAD_PORT), '-j', 'ACCEPT'])
     if check_rule.returncode != 0:
@@ -156,54 +314,77 @@ def start_download_server(file_path):
 
 def stop_download_server():
     """Encerra o servidor HTTP de download, se ativo."""
-    global DOWNLOAD_SERVER, DOWNLOAD_THREAD
+    global DOWNLOAD_SERVER, DOWNLOAD_THREAD, DOWNLOAD_TIMER
+    if DOWNLOAD_TIMER:
+        DOWNLOAD_TIMER.cancel()
+        DOWNLOAD_TIMER = None
     if DOWNLOAD_SERVER:
+        server = DOWNLOAD_SERVER
+        DOWNLOAD_SERVER = None
+        # shutdown() só retorna quando o serve_forever percebe o pedido, o que
+        # normalmente leva até DOWNLOAD_POLL_INTERVAL. Fechar a escuta do
+        # socket acorda o select imediatamente.
+        stopper = threading.Thread(target=server.shutdown, daemon=True)
+        stopper.start()
+        try:
+            server.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        stopper.join(timeout=1)
         try:
-            DOWNLOAD_SERVER.server_close()
+            server.server_close()
         except Exception:
             pass
-        DOWNLOAD_SERVER = None
     if DOWNLOAD_THREAD and DOWNLOAD_THREAD.is_alive():
         DOWNLOAD_THREAD.join(timeout=0.1)
     DOWNLOAD_THREAD = None
 
 def get_remaining_download_time():
     """Retorna o tempo restante (em minutos) para o servidor de download."""
-    if not DOWNLOAD_START_TIME:
+    if DOWNLOAD_START_TIME is None:
         return DOWNLOAD_DURATION // 60
-    elapsed = (datetime.now() - DOWNLOAD_START_TIME).total_seconds()
+    elapsed = time.monotonic() - DOWNLOAD_START_TIME
     remaining = max(DOWNLOAD_DURATION - elapsed, 0)
     return int(remaining // 60) or 1
 
 def is_download_server_active():
     """Retorna True se o servidor de download estiver rodando."""
-    return DOWNLOAD_SERVER is not None
+    if DOWNLOAD_SERVER is None:
+        return False
+    return DOWNLOAD_START_TIME is None or time.monotonic() - DOWNLOAD_START_TIME < DOWNLOAD_DURATION
 
 # --------------------------------------------------------------------
 # Helpers de serviço
 # --------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
 def detect_service_candidates():
-    """Tenta detectar serviços openvpn@*.service ativos ou instalados."""
+    """Tenta detectar serviços openvpn@*.service ativos ou instalados.
+
+    Instâncias vêm antes da unidade simples openvpn.service, que fica como
+    última opção. Memorizado; invalidate_openvpn_caches() limpa após
+    instalar/remover.
+    """
     result = run_cmd(['systemctl', 'list-unit-files', '--type=service', '--no-legend'])
-    units = []
-    if result.returncode == 0:
-        for line in result.stdout.splitlines():
-            parts = line.split()
-            if parts and parts[0].startswith('openvpn@'):
-                name = parts[0]
-                if name not in units:
-                    units.append(name)
-    return units
+    if result.returncode != 0:
+        return []
+    # Uma varredura da listagem; dict.fromkeys remove duplicatas mantendo a ordem
+    units = dict.fromkeys(_RE_UNIT.findall(result.stdout))
+    return sorted(units, key=lambda u: '@' not in u)
+
+def is_unit_active(unit):
+    """Retorna True se a unidade systemd estiver com ActiveState=active."""
+    r = run_cmd(['systemctl', 'show', '-p', 'ActiveState', '--value', unit])
+    return r.returncode == 0 and r.stdout.strip() == "active"
 
 def pick_server_unit():
     """Retorna o primeiro serviço systemd encontrado, ou None."""
     units = detect_service_candidates()
     return units[0] if units else None
 
+@functools.lru_cache(maxsize=None)
 def verificar_openvpn_instalado():
     """Retorna True se o OpenVPN parece estar instalado e configurado."""
-    r = run_cmd(['which', 'openvpn'])
-    if not (r.returncode == 0 and r.stdout.strip()):
+    if not which('openvpn'):
         return False
     # Configuração
     if find_server_conf():
@@ -213,46 +394,49 @@ def verificar_openvpn_instalado():
         return True
     return False
 
+# Resultado do parse por arquivo: {path: ((mtime_ns, tamanho), resultado)}
+_CONF_PARSE_CACHE = {}
+
 def parse_port_proto_dns(conf_path):
-    """Extrai porta, protocolo e DNS da configuração do servidor."""
+    """Extrai porta, protocolo e DNS da configuração do servidor.
+
+    O resultado é memorizado por (mtime, tamanho) do arquivo, então só é
+    recalculado quando o server.conf muda.
+    """
+    try:
+        st = os.stat(conf_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    hit = _CONF_PARSE_CACHE.get(conf_path)
+    if stamp is not None and hit and hit[0] == stamp:
+        return hit[1]
+    result = _parse_port_proto_dns(conf_path)
+    if stamp is not None:
+        _CONF_PARSE_CACHE[conf_path] = (stamp, result)
+    return result
+
+def _parse_port_proto_dns(conf_path):
     port = "1194"
     proto = "udp"
     dns_list = []
+    # Varre o arquivo mapeado em memória; só os grupos capturados são decodificados
     try:
-        with open(conf_path, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                ls = line.strip()
-                if not ls or ls.startswith("#"):
-                    continue
-                low = ls.lower()
-                if low.startswith("port "):
-                    parts = ls.split()
-                    if len(parts) >= 2 and parts[1].isdigit():
-                        port = parts[1]
-                elif low.startswith("proto "):
-                    parts = ls.split()
-                    if len(parts) >= 2:
-                        proto = parts[1].lower()
-                elif low.startswith('push "') and "dhcp-option" in low and " dns " in low:
-                    m = re.search(r'DNS\s+([0-9]{1,3}(?:\.[0-9]{1,3}){3})', ls, re.I)
-                    if m:
-                        dns_list.append(m.group(1))
-    except Exception:
+        with open(conf_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in _CONF_RE_BYTES.finditer(mm):
+                if m.group("port"):
+                    port = m.group("port").decode()
+                elif m.group("proto"):
+                    proto = m.group("proto").decode(errors="replace").lower()
+                else:
+                    dns_list.append(m.group("dns").decode())
+    except (OSError, ValueError):
+        # Arquivo ausente/ilegível ou vazio (mmap de 0 bytes): usa os padrões
         pass
-    dns_label = "custom"
-    set_dns = set(dns_list)
-    if set_dns == {"8.8.8.8", "8.8.4.4"}:
-        dns_label = "google"
-    elif set_dns == {"1.1.1.1", "1.0.0.1"}:
-        dns_label = "cloudflare"
-    elif set_dns == {"9.9.9.9", "149.112.112.112"}:
-        dns_label = "quad9"
-    elif set_dns == {"208.67.222.222", "208.67.220.220"}:
-        dns_label = "opendns"
-    elif not dns_list:
-        dns_label = "desconhecido"
-    return port, proto, dns_label, dns_list
+    dns_label = _DNS_LABELS.get(frozenset(dns_list), "custom" if dns_list else "desconhecido")
+    return port, proto, dns_label, tuple(dns_list)
 
+@functools.lru_cache(maxsize=None)
 def find_server_conf():
     """Retorna o caminho para /etc/openvpn/server.conf se existir."""
     candidates = [
@@ -267,26 +451,46 @@ def find_server_conf():
 # --------------------------------------------------------------------
 # Helpers de firewall
 # --------------------------------------------------------------------
+def _input_accept_re(port):
+    """Regex para linhas de iptables-save que liberam `port` em INPUT."""
+    return re.compile(rf'^-A INPUT -p (tcp|udp)(?: -m \1)? --dport {port} -j ACCEPT\n?', re.M)
+
+def _firewall_delta(dump, old_port, new_port):
+    """Monta só as mudanças (-D/-A) de old_port para new_port na tabela filter."""
+    m = _RE_FILTER_TABLE.search(dump)
+    table = m.group(0) if m else ""
+    lines = [f"-D{l.group(0).rstrip()[2:]}\n" for l in _input_accept_re(old_port).finditer(table)]
+    present = {l.group(1) for l in _input_accept_re(new_port).finditer(table)}
+    lines += [f"-A INPUT -p {p} --dport {new_port} -j ACCEPT\n"
+              for p in ('udp', 'tcp') if p not in present]
+    return "*filter\n" + "".join(lines) + "COMMIT\n" if lines else ""
+
 def update_firewall_port(old_port, new_port):
-    """Remove regras antigas para old_port e adiciona regras para new_port."""
-    run_cmd(['iptables', '-D', 'INPUT', '-p', 'udp', '--dport', str(old_port), '-j', 'ACCEPT'])
-    run_cmd(['iptables', '-D', 'INPUT', '-p', 'tcp', '--dport', str(old_port), '-j', 'ACCEPT'])
-    # Adiciona regra UDP se ainda não existir
-    check_udp = run_cmd(['iptables', '-C', 'INPUT', '-p', 'udp', '--dport', str(new_port), '-j', 'ACCEPT'])
-    if check_udp.returncode != 0:
-        run_cmd(['iptables', '-A', 'INPUT', '-p', 'udp', '--dport', str(new_port), '-j', 'ACCEPT'])
-    # Adiciona regra TCP se ainda não existir
-    check_tcp = run_cmd(['iptables', '-C', 'INPUT', '-p', 'tcp', '--dport', str(new_port), '-j', 'ACCEPT'])
-    if check_tcp.returncode != 0:
-        run_cmd(['iptables', '-A', 'INPUT', '-p', 'tcp', '--dport', str(new_port), '-j', 'ACCEPT'])
+    """Remove regras antigas para old_port e adiciona regras para new_port.
+
+    Lê o conjunto atual com um único iptables-save e aplica só o delta com
+    iptables-restore --noflush, preservando regras de outras ferramentas.
+    Retorna (True, msg) em caso de sucesso.
+    """
+    if str(old_port) == str(new_port):
+        return True, "Firewall inalterado"
+    saved = run_cmd(['iptables-save'], timeout=10)
+    if saved.returncode != 0:
+        return False, saved.stderr.strip() or "Falha ao ler regras do iptables"
+    delta = _firewall_delta(saved.stdout, old_port, new_port)
+    if not delta:
+        return True, "Firewall inalterado"
+    res = run_cmd(['iptables-restore', '--noflush'], timeout=10, input=delta)
+    if res.returncode != 0:
+        return False, res.stderr.strip() or "Falha ao aplicar regras do iptables"
     if os.path.exists("/etc/iptables/rules.v4"):
         save_result = run_cmd(['iptables-save'], timeout=10)
         if save_result.returncode == 0:
             try:
-                with open("/etc/iptables/rules.v4", "w") as f:
-                    f.write(save_result.stdout)
+                write_file("/etc/iptables/rules.v4", save_result.stdout)
             except Exception:
                 pass
+    return True, "Firewall atualizado"
 
 # --------------------------------------------------------------------
 # Controle do serviço OpenVPN
@@ -300,9 +504,18 @@ def restart_openvpn():
     res = run_cmd(['systemctl', 'restart', unit], timeout=20)
     if res.returncode != 0:
         return False, res.stderr.strip() or "Falha ao reiniciar serviço"
-    time.sleep(1.5)
-    st = run_cmd(['systemctl', 'is-active', unit])
-    if st.stdout.strip() == "active":
+    # Em vez de um sleep fixo, aguarda até RESTART_SETTLE segundos pelo
+    # servidor abrir a porta configurada (lida em /proc/net, sem conectar).
+    conf = find_server_conf()
+    port, proto = parse_port_proto_dns(conf)[:2] if conf else (None, None)
+    if not port:
+        time.sleep(RESTART_SETTLE)
+    else:
+        deadline = time.monotonic() + RESTART_SETTLE
+        while time.monotonic() < deadline and not _proc_bound(port, proto):
+            time.sleep(0.05)
+    # Consulta o estado da unidade uma única vez, após a espera
+    if is_unit_active(unit):
         return True, "Serviço reiniciado"
     log = run_cmd(['journalctl', '-xeu', unit, '--no-pager', '-n', '30'], timeout=10).stdout
     return False, f"Falha ao iniciar. Logs:\n{log}"
@@ -310,23 +523,40 @@ def restart_openvpn():
 # --------------------------------------------------------------------
 # Integração com openvpn.sh
 # --------------------------------------------------------------------
-def descobrir_script_openvpn():
-    """Localiza script shell de instalação/gerência openvpn.sh, se existir."""
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Locais possíveis do openvpn.sh, em ordem de preferência
+OPENVPN_SCRIPT_CANDIDATES = (
+    os.path.join(_ROOT_DIR, "conexoes", "openvpn.sh"),
+    os.path.join(_ROOT_DIR, "conexoes", "openvpn-manager.sh"),
+    "/opt/multiflow/conexoes/openvpn.sh",
+    "/opt/multiflow/conexoes/openvpn-manager.sh",
+    "/etc/openvpn/openvpn-manager.sh",
+)
+_SCRIPT_CACHE = {"path": None}  # Último openvpn.sh encontrado
+
+def descobrir_script_openvpn(refresh=False):
+    """Localiza script shell de instalação/gerência openvpn.sh, se existir.
+
+    O caminho encontrado é memorizado durante a vida do processo; uma
+    busca sem sucesso não é, para que o script possa aparecer depois.
+    refresh=True descarta o caminho memorizado.
+    """
+    if refresh:
+        _SCRIPT_CACHE["path"] = None
+    elif _SCRIPT_CACHE["path"]:
+        return _SCRIPT_CACHE["path"]
     env_path = os.environ.get("OVPN_SCRIPT_PATH")
-    if env_path and os.path.exists(env_path):
-        return env_path
-    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    candidates = [
-        os.path.join(root_dir, "conexoes", "openvpn.sh"),
-        os.path.join(root_dir, "conexoes", "openvpn-manager.sh"),
-        "/opt/multiflow/conexoes/openvpn.sh",
-        "/opt/multiflow/conexoes/openvpn-manager.sh",
-        "/etc/openvpn/openvpn-manager.sh",
-    ]
-    for c in candidates:
-        if os.path.exists(c):
-            return c
-    return None
+    candidates = ((env_path,) if env_path else ()) + OPENVPN_SCRIPT_CANDIDATES
+    path = next((c for c in candidates if os.path.exists(c)), None)
+    _SCRIPT_CACHE["path"] = path
+    return path
+
+def invalidate_openvpn_caches():
+    """Descarta as detecções memorizadas; usar após instalar/desinstalar."""
+    verificar_openvpn_instalado.cache_clear()
+    find_server_conf.cache_clear()
+    detect_service_candidates.cache_clear()
+    _CONF_PARSE_CACHE.clear()
 
 def executar_script_openvpn():
     """Executa o script shell openvpn.sh de forma não-interativa.
@@ -351,10 +581,23 @@ def executar_script_openvpn():
         # Sai da tela alternada para que o usuário veja a execução do shell script
         TerminalManager.leave_alt_screen()
         # Garante permissão de execução
-        subprocess.run(['chmod', '+x', script_path], check=False)
+        try:
+            try:
+                st = os.stat(script_path)
+            except FileNotFoundError:
+                # O caminho memorizado sumiu: procura de novo uma única vez
+                script_path = descobrir_script_openvpn(refresh=True)
+                if not script_path:
+                    TerminalManager.enter_alt_screen()
+                    return False, "Script openvpn.sh não encontrado."
+                st = os.stat(script_path)
+            os.chmod(script_path, st.st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        except OSError:
+            pass
         # Alimenta "1\n" como resposta automática à pergunta inicial do script
         # definindo text=True para aceitar string como input
-        result = subprocess.run(['bash', script_path], input='1\n', text=True)
+        result = subprocess.run([BASH, script_path], input='1\n', text=True)
+        invalidate_openvpn_caches()
         # Volta para a tela alternada após finalização
         TerminalManager.enter_alt_screen()
         # Retorna True/False dependendo do código de saída
@@ -393,7 +636,7 @@ def criar_arquivo_ovpn(client_name):
         # Gera certificado se não existir
         try:
             os.chdir(easy_rsa_dir)
-            create_result = run_cmd(['bash', '-c', f'echo "yes" | ./easyrsa build-client-full "{client_name}" nopass'], timeout=30)
+            create_result = run_cmd([BASH, '-c', f'echo "yes" | ./easyrsa build-client-full "{client_name}" nopass'], timeout=30)
             if create_result.returncode != 0:
                 return None, "Erro ao criar certificado do cliente"
         except Exception as e:
@@ -402,55 +645,41 @@ def criar_arquivo_ovpn(client_name):
     os.makedirs(client_dir, exist_ok=True)
     ovpn_file = os.path.join(client_dir, f"{client_name}.ovpn")
     try:
-        with open(f"{conf_dir}/ca.crt", 'r') as f:
-            ca_cert = f.read().strip()
-        with open(f"{easy_rsa_dir}/pki/issued/{client_name}.crt", 'r') as f:
-            client_cert_content = f.read().strip()
-        with open(f"{easy_rsa_dir}/pki/private/{client_name}.key", 'r') as f:
-            client_key = f.read().strip()
-        tls_key = ""
-        tls_directive = ""
-        if os.path.exists(f"{conf_dir}/tc.key"):
-            with open(f"{conf_dir}/tc.key", 'r') as f:
-                tls_key = f.read().strip()
-            tls_directive = f"<tls-crypt>\n{tls_key}\n</tls-crypt>"
-        elif os.path.exists(f"{conf_dir}/ta.key"):
-            with open(f"{conf_dir}/ta.key", 'r') as f:
-                tls_key = f.read().strip()
-            tls_directive = f"<tls-auth>\n{tls_key}\n</tls-auth>\nkey-direction 1"
-        ovpn_content = f"""# OpenVPN Client Configuration
-    client
-    dev tun
-    proto {proto}
-    remote {server_ip} {port}
-    resolv-retry infinite
-    nobind
-    persist-key
-    persist-tun
-    remote-cert-tls server
-    auth SHA512
-    cipher AES-256-GCM
-    verb 3
-    mute 20
-    tun-mtu 1500
-    mssfix 1420
-    sndbuf 0
-    rcvbuf 0
-    tls-version-min 1.2
-
-    <ca>
-    {ca_cert}
-    </ca>
-    <cert>
-    {client_cert_content}
-    </cert>
-    <key>
-    {client_key}
-    </key>
-    {tls_directive}
-    """
-        with open(ovpn_file, 'w') as f:
-            f.write(ovpn_content)
+        paths = {
+            "ca": f"{conf_dir}/ca.crt",
+            "cert": f"{easy_rsa_dir}/pki/issued/{client_name}.crt",
+            "key": f"{easy_rsa_dir}/pki/private/{client_name}.key",
+        }
+        # Um único scandir diz quais arquivos existem no diretório do servidor
+        with os.scandir(conf_dir) as it:
+            present = {e.name for e in it}
+        if "ca.crt" not in present:
+            return None, f"Arquivo ausente: {conf_dir}/ca.crt"
+        # Decide antes qual chave TLS existe para ler tudo de uma vez
+        tls_kind = None
+        if "tc.key" in present:
+            tls_kind, paths["tls"] = "crypt", f"{conf_dir}/tc.key"
+        elif "ta.key" in present:
+            tls_kind, paths["tls"] = "auth", f"{conf_dir}/ta.key"
+        # Leituras independentes: sobrepõe a latência de disco
+        with ThreadPoolExecutor(max_workers=len(paths)) as ex:
+            futs = {k: ex.submit(Path(p).read_bytes) for k, p in paths.items()}
+        certs = {k: f.result().strip() for k, f in futs.items()}
+        ca_cert, client_cert_content, client_key = certs["ca"], certs["cert"], certs["key"]
+        tls_directive = b""
+        if tls_kind == "crypt":
+            tls_directive = b"<tls-crypt>\n" + certs["tls"] + b"\n</tls-crypt>\n"
+        elif tls_kind == "auth":
+            tls_directive = b"<tls-auth>\n" + certs["tls"] + b"\n</tls-auth>\nkey-direction 1\n"
+        parts = [
+            OVPN_CLIENT_TEMPLATE.format(proto=proto, ip=server_ip, port=port).encode(),
+            b"<ca>\n", ca_cert, b"\n</ca>\n",
+            b"<cert>\n", client_cert_content, b"\n</cert>\n",
+            b"<key>\n", client_key, b"\n</key>\n",
+            tls_directive,
+        ]
+        with open(ovpn_file, 'wb') as f:
+            f.writelines(parts)
         return ovpn_file, None
     except Exception as e:
         return None, f"Erro ao criar arquivo OVPN: {str(e)}"
@@ -459,76 +688,124 @@ def criar_arquivo_ovpn(client_name):
 # Helpers de edição e backup de configuração
 # --------------------------------------------------------------------
 def backup_file(path):
-    """Cria uma cópia de backup do arquivo com sufixo timestamp."""
+    """Cria um backup do arquivo com sufixo timestamp.
+
+    Usa hardlink sempre que possível: como write_file substitui o arquivo
+    via os.replace, o link continua apontando para o conteúdo antigo sem
+    copiar nenhum byte. Se o link falhar (ex.: filesystem sem suporte ou
+    backup já existente), cai para a cópia tradicional.
+    """
     try:
         ts = time.strftime("%Y%m%d-%H%M%S")
-        copyfile(path, f"{path}.bak-{ts}")
+        backup = f"{path}.bak-{ts}"
+        try:
+            os.link(path, backup)
+        except OSError:
+            copyfile(path, backup)
         return True
     except Exception:
         return False
 
 def write_file(path, content):
-    """Escreve texto em um arquivo com codificação UTF-8."""
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+    """Escreve texto em um arquivo com codificação UTF-8 de forma atômica.
+
+    O conteúdo vai para um arquivo temporário no mesmo diretório, que
+    substitui o original via os.replace; uma falha no meio da escrita
+    nunca deixa a configuração truncada. As permissões do arquivo
+    original são preservadas.
+    """
+    tmp = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp, "w", encoding="utf-8", buffering=CONF_IO_BUFFER) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
 
 def read_file(path):
     """Lê conteúdo de um arquivo ignorando erros de codificação."""
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+    with open(path, "r", encoding="utf-8", errors="ignore", buffering=CONF_IO_BUFFER) as f:
         return f.read()
 
-def set_conf_port(conf_path, new_port):
-    """Substitui ou insere diretiva 'port' no arquivo de configuração."""
-    text = read_file(conf_path)
-    if re.search(r'^\s*port\s+\d+', text, re.M):
-        text = re.sub(r'^\s*port\s+\d+', f"port {new_port}", text, flags=re.M)
-    else:
-        text = f"port {new_port}\n" + text
-    write_file(conf_path, text)
+def _sub_conf_port(text, new_port):
+    """Substitui ou insere diretiva 'port' no texto da configuração."""
+    text, n = _RE_PORT.subn(f"port {new_port}", text)
+    if n:
+        return text
+    return f"port {new_port}\n" + text
 
-def set_conf_proto(conf_path, new_proto):
-    """Substitui ou insere diretiva 'proto' no arquivo de configuração."""
-    text = read_file(conf_path)
-    if re.search(r'^\s*proto\s+\w+', text, re.M):
-        text = re.sub(r'^\s*proto\s+\w+', f"proto {new_proto}", text, flags=re.M)
-    else:
-        text = f"proto {new_proto}\n" + text
-    write_file(conf_path, text)
+def _sub_conf_proto(text, new_proto):
+    """Substitui ou insere diretiva 'proto' no texto da configuração."""
+    text, n = _RE_PROTO.subn(f"proto {new_proto}", text)
+    if n:
+        return text
+    return f"proto {new_proto}\n" + text
 
-def set_conf_dns(conf_path, dns_list):
-    """Substitui ou insere diretivas DHCP DNS no arquivo de configuração."""
-    text = read_file(conf_path)
+def _sub_conf_dns(text, dns_list):
+    """Substitui ou insere diretivas DHCP DNS no texto da configuração."""
     # Remove todas as diretivas push "dhcp-option DNS X.X.X.X"
-    text = re.sub(r'^\s*push\s+"dhcp-option\s+DNS\s+[0-9.]+"\s*$', '', text, flags=re.M)
+    text = _RE_DNS_PUSH.sub('', text)
+    insert = ''.join(f'push "dhcp-option DNS {ip}"\n' for ip in dns_list)
+    if not insert:
+        return text
     # Insere novas entradas logo após a linha 'push "redirect-gateway def1 bypass-dhcp"'
-    lines = text.splitlines()
-    idx = -1
-    for i, line in enumerate(lines):
-        if line.strip().startswith('push "redirect-gateway'):
-            idx = i
-            break
-    new_push_lines = [f"push \"dhcp-option DNS {dns}\"" for dns in dns_list]
-    if idx != -1:
-        lines[idx+1:idx+1] = new_push_lines
-    else:
-        lines.extend(new_push_lines)
-    write_file(conf_path, "\n".join(lines))
+    if _RE_REDIRECT_GW.search(text):
+        return _RE_REDIRECT_GW.sub(lambda m: m.group(0) + '\n' + insert.rstrip('\n'), text, count=1)
+    if text and not text.endswith('\n'):
+        text += '\n'
+    return text + insert
+
+def apply_conf_changes(conf_path, *, port=None, proto=None, dns=None, backup=False):
+    """Aplica porta, protocolo e/ou DNS com uma única leitura e escrita.
+
+    Apenas os campos informados (diferentes de None) são alterados. Se o
+    texto resultante for igual ao atual, nada é gravado (nem o backup) e
+    retorna False; caso contrário retorna True.
+    """
+    original = read_file(conf_path)
+    text = original
+    if port is not None:
+        text = _sub_conf_port(text, port)
+    if proto is not None:
+        text = _sub_conf_proto(text, proto)
+    if dns is not None:
+        text = _sub_conf_dns(text, dns)
+    if text == original:
+        return False
+    if backup:
+        backup_file(conf_path)
+    write_file(conf_path, text)
+    return True
 
 def update_clients_configs(new_port=None, new_proto=None):
     """Atualiza configurações de clientes existentes ao alterar porta ou protocolo."""
     client_dir = os.path.expanduser("~/ovpn-clients")
     if not os.path.isdir(client_dir):
         return
-    for filename in os.listdir(client_dir):
-        if filename.endswith(".ovpn"):
-            path = os.path.join(client_dir, filename)
+    with os.scandir(client_dir) as it:
+        for entry in it:
+            if not (entry.name.endswith(".ovpn") and entry.is_file(follow_symlinks=False)):
+                continue
             try:
-                content = read_file(path)
+                original = read_file(entry.path)
+                content = original
                 if new_proto:
-                    content = re.sub(r'^proto\s+\w+', f"proto {new_proto}", content, flags=re.M)
+                    content = _RE_CLIENT_PROTO.sub(f"proto {new_proto}", content)
                 if new_port:
-                    content = re.sub(r'^(remote\s+\S+\s+)\d+(\b.*)$', rf'\g<1>{new_port}\2', content, flags=re.M)
-                write_file(path, content)
+                    content = _RE_REMOTE_PORT.sub(rf'\g<1>{new_port}\2', content)
+                # Só regrava (e faz fsync) se algo realmente mudou
+                if content != original:
+                    write_file(entry.path, content)
             except Exception:
                 pass
 
@@ -543,7 +820,7 @@ def is_valid_port(p):
         return False
 
 # Regex para validar IPv4 (utilizado no input de DNS customizado)
-ipv4_re = re.compile(r'^(25[0-5]|2[0-4]\d|1?\d?\d)(\.(25[0-5]|2[0-4]\d|1?\d?\d)){3}$')
+ipv4_re = re.compile(r'(25[0-5]|2[0-4]\d|1?\d?\d)(\.(25[0-5]|2[0-4]\d|1?\d?\d)){3}')
 
 def alterar_porta():
     conf = find_server_conf()
@@ -551,19 +828,25 @@ def alterar_porta():
         return False, "OpenVPN não instalado/configurado."
     port, proto, _, _ = parse_port_proto_dns(conf)
     TerminalManager.before_input()
-    new_port = input(f"\n{MC.BOLD}Nova porta (atual {port}): {MC.RESET}").strip()
+    new_port = TerminalManager.read_line(f"\n{MC.BOLD}Nova porta (atual {port}): {MC.RESET}")
     TerminalManager.after_input()
     if not is_valid_port(new_port):
         return False, "Porta inválida."
     try:
-        backup_file(conf)
-        set_conf_port(conf, new_port)
+        if not apply_conf_changes(conf, port=new_port, backup=True):
+            return True, f"A porta já é {new_port}. Nada alterado."
+        # Firewall e arquivos dos clientes são independentes: roda em paralelo
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fw = ex.submit(update_firewall_port, port, new_port)
+            clients = ex.submit(update_clients_configs, new_port=new_port, new_proto=None)
         try:
-            update_firewall_port(port, new_port)
-        except Exception:
-            pass
-        update_clients_configs(new_port=new_port, new_proto=None)
+            fw_ok, fw_msg = fw.result()
+        except Exception as e:
+            fw_ok, fw_msg = False, str(e)
+        clients.result()
         ok, msg = restart_openvpn()
+        if not fw_ok:
+            return False, f"Porta alterada para {new_port}. {msg}. Erro no firewall: {fw_msg}"
         return ok, f"Porta alterada para {new_port}. {msg}"
     except Exception as e:
         return False, f"Erro ao alterar porta: {e}"
@@ -579,14 +862,14 @@ def alterar_protocolo():
     print("  1) TCP")
     print("  2) UDP")
     TerminalManager.before_input()
-    choice = input(f"{MC.BOLD}Opção: {MC.RESET}").strip()
+    choice = TerminalManager.read_line(f"{MC.BOLD}Opção: {MC.RESET}")
     TerminalManager.after_input()
     new_proto = "tcp" if choice == "1" else "udp" if choice == "2" else None
     if not new_proto:
         return False, "Operação cancelada."
     try:
-        backup_file(conf)
-        set_conf_proto(conf, new_proto)
+        if not apply_conf_changes(conf, proto=new_proto, backup=True):
+            return True, f"O protocolo já é {new_proto.upper()}. Nada alterado."
         update_clients_configs(new_port=None, new_proto=new_proto)
         ok, msg = restart_openvpn()
         return ok, f"Protocolo alterado para {new_proto.upper()}. {msg}"
@@ -606,7 +889,7 @@ def alterar_dns():
     print("  4) OpenDNS (208.67.222.222, 208.67.220.220)")
     print("  5) Personalizado")
     TerminalManager.before_input()
-    choice = input(f"{MC.BOLD}Opção: {MC.RESET}").strip()
+    choice = TerminalManager.read_line(f"{MC.BOLD}Opção: {MC.RESET}")
     TerminalManager.after_input()
     if choice == "1":
         dns = ["8.8.8.8", "8.8.4.4"]
@@ -618,17 +901,17 @@ def alterar_dns():
         dns = ["208.67.222.222", "208.67.220.220"]
     elif choice == "5":
         TerminalManager.before_input()
-        custom = input(f"{MC.BOLD}Informe um ou dois DNS (separados por espaço): {MC.RESET}").strip()
+        custom = TerminalManager.read_line(f"{MC.BOLD}Informe um ou dois DNS (separados por espaço): {MC.RESET}")
         TerminalManager.after_input()
-        parts = [p for p in custom.split() if ipv4_re.match(p)]
+        parts = [p for p in custom.split() if ipv4_re.fullmatch(p)]
         if not parts:
             return False, "DNS inválido."
         dns = parts[:2]
     else:
         return False, "Operação cancelada."
     try:
-        backup_file(conf)
-        set_conf_dns(conf, dns)
+        if not apply_conf_changes(conf, dns=dns, backup=True):
+            return True, "DNS já configurado. Nada alterado."
         ok, msg = restart_openvpn()
         return ok, f"DNS alterado. {msg}"
     except Exception as e:
@@ -640,7 +923,7 @@ def gerar_download_ovpn():
     if not verificar_openvpn_instalado():
         return False, "OpenVPN não está instalado"
     TerminalManager.before_input()
-    client_name = input(f"\n{MC.BOLD}Nome do cliente (ex. user1): {MC.RESET}").strip()
+    client_name = TerminalManager.read_line(f"\n{MC.BOLD}Nome do cliente (ex. user1): {MC.RESET}")
     TerminalManager.after_input()
     if not client_name:
         return False, "Nome inválido."
@@ -651,6 +934,31 @@ def gerar_download_ovpn():
     start_download_server(ovpn_file)
     return True, f"Arquivo gerado: {client_name}.ovpn (porta {DOWNLOAD_PORT})"
 
+@functools.lru_cache(maxsize=1)
+def _os_release():
+    """Retorna /etc/os-release como dict, lido uma única vez.
+
+    Usa platform.freedesktop_os_release() quando disponível (Python 3.10+)
+    e, caso contrário, interpreta o arquivo com shlex.
+    """
+    try:
+        return platform.freedesktop_os_release()
+    except AttributeError:
+        pass
+    except OSError:
+        return {}
+    info = {}
+    try:
+        with open("/etc/os-release") as f:
+            tokens = shlex.split(f.read(), comments=True)
+    except (OSError, ValueError):
+        return info
+    for tok in tokens:
+        key, sep, value = tok.partition("=")
+        if sep:
+            info[key] = value
+    return info
+
 def desinstalar_openvpn():
     """Interação para desinstalar OpenVPN e easy-rsa.
 
@@ -661,20 +969,12 @@ def desinstalar_openvpn():
     # Aviso ao usuário
     print(f"\n{MC.RED_GRADIENT}ATENÇÃO: Isso removerá OpenVPN e easy-rsa.{MC.RESET}")
     TerminalManager.before_input()
-    c = input(f"{MC.BOLD}Confirmar? [s/N]: {MC.RESET}").strip().lower()
+    c = TerminalManager.read_line(f"{MC.BOLD}Confirmar? [s/N]: {MC.RESET}").lower()
     TerminalManager.after_input()
     if c != "s":
         return False, "Operação cancelada."
     # Tenta detectar sistema
-    os_release = {}
-    try:
-        with open("/etc/os-release") as f:
-            for line in f:
-                if "=" in line:
-                    k, v = line.strip().split("=", 1)
-                    os_release[k] = v.strip('"')
-    except Exception:
-        pass
+    os_release = _os_release()
     id_like = (os_release.get("ID_LIKE", "") + " " + os_release.get("ID", "")).lower()
     # Para Debian/Ubuntu usa apt, caso contrário yum (CentOS/Fedora/RHEL)
     if any(x in id_like for x in ["debian", "ubuntu"]):
@@ -686,12 +986,39 @@ def desinstalar_openvpn():
         run_cmd(['systemctl', 'stop', pick_server_unit() or 'openvpn@server'])
         r = run_cmd(['yum', 'remove', '-y', 'openvpn', 'easy-rsa'], timeout=120)
         ok = r.returncode == 0
+    invalidate_openvpn_caches()
     return ok, ("Desinstalado" if ok else "Falha ao desinstalar")
 
 # --------------------------------------------------------------------
 # UI helpers
 # --------------------------------------------------------------------
+# Último quadro de status renderizado e a chave que o gerou
+_STATUS_BOX_CACHE = {"key": None, "frame": None}
+
+def _status_box_key():
+    """Chave barata que muda sempre que o quadro de status precisa mudar."""
+    conf = find_server_conf()
+    try:
+        mtime = os.stat(conf).st_mtime_ns if conf else None
+    except OSError:
+        mtime = None
+    download = get_remaining_download_time() if is_download_server_active() else None
+    cols, _ = TerminalManager.size()
+    return conf, mtime, download, cols
+
+def invalidate_status_box():
+    """Força a reconstrução do quadro de status no próximo render."""
+    _STATUS_BOX_CACHE["key"] = None
+
 def build_status_box():
+    """Retorna o quadro de status, reaproveitando o último se nada mudou."""
+    key = _status_box_key()
+    if key != _STATUS_BOX_CACHE["key"]:
+        _STATUS_BOX_CACHE["frame"] = _render_status_box()
+        _STATUS_BOX_CACHE["key"] = key
+    return _STATUS_BOX_CACHE["frame"]
+
+def _render_status_box():
     installed = verificar_openvpn_instalado()
     status_str = "Openvpn instalado" if installed else "Openvpn não instalado"
     porta = "—"
@@ -703,7 +1030,7 @@ def build_status_box():
             port, proto, dns_lab, _ = parse_port_proto_dns(conf)
             porta = port
             protocolo = proto.upper()
-            dns_label = {"google": "google", "cloudflare": "cloudflare"}.get(dns_lab, dns_lab)
+            dns_label = dns_lab
     lines = [
         f"{MC.CYAN_LIGHT}Status:{MC.RESET} {MC.WHITE}{status_str}{MC.RESET}",
         f"{MC.CYAN_LIGHT}Porta:{MC.RESET} {MC.WHITE}{porta}{MC.RESET}",
@@ -715,21 +1042,26 @@ def build_status_box():
         lines.append(f"{MC.CYAN_LIGHT}Download:{MC.RESET} {MC.GREEN}Ativo ({remaining} min restantes){MC.RESET}")
     return modern_box("STATUS", lines, "", MC.PURPLE_GRADIENT, MC.PURPLE_LIGHT)
 
+@functools.lru_cache(maxsize=4)
+def _menu_static_parts(cols):
+    """Cabeçalho e opções do menu, que só dependem da largura do terminal."""
+    header = simple_header("GERENCIADOR OPENVPN")
+    options = "".join([
+        "\n",
+        menu_option("1", "Instalar openvpn", "", MC.GREEN_GRADIENT),
+        menu_option("2", "Alterar porta", "", MC.CYAN_GRADIENT),
+        menu_option("3", "Alterar protocolo", "", MC.BLUE_GRADIENT),
+        menu_option("4", "Alterar Dns", "", MC.ORANGE_GRADIENT),
+        menu_option("5", "Gerar e baixar arquivo ovpn", "", MC.MAGENTA_GRADIENT),
+        menu_option("6", "Desinstalar Openvpn", "", MC.RED_GRADIENT),
+        "\n",
+        menu_option("0", "Voltar", "", MC.YELLOW_GRADIENT),
+    ])
+    return header, options
+
 def build_menu_frame(status_msg=""):
-    s = []
-    s.append(simple_header("GERENCIADOR OPENVPN"))
-    s.append(build_status_box())
-    s.append("\n")
-    s.append(menu_option("1", "Instalar openvpn", "", MC.GREEN_GRADIENT))
-    s.append(menu_option("2", "Alterar porta", "", MC.CYAN_GRADIENT))
-    s.append(menu_option("3", "Alterar protocolo", "", MC.BLUE_GRADIENT))
-    s.append(menu_option("4", "Alterar Dns", "", MC.ORANGE_GRADIENT))
-    s.append(menu_option("5", "Gerar e baixar arquivo ovpn", "", MC.MAGENTA_GRADIENT))
-    s.append(menu_option("6", "Desinstalar Openvpn", "", MC.RED_GRADIENT))
-    s.append("\n")
-    s.append(menu_option("0", "Voltar", "", MC.YELLOW_GRADIENT))
-    s.append(footer_line(status_msg))
-    return "".join(s)
+    header, options = _menu_static_parts(TerminalManager.size()[0])
+    return "".join([header, build_status_box(), options, footer_line(status_msg)])
 
 def build_operation_frame(title, icon, color, msg="Aguarde..."):
     s = []
@@ -749,12 +1081,27 @@ def main_menu():
     ensure_root()
     TerminalManager.enter_alt_screen()
     status_msg = ""
+    prompt = f"\n{MC.PURPLE_GRADIENT}{MC.BOLD}└─ Escolha uma opção: {MC.RESET}"
+    last_frame = None
     try:
         while True:
-            TerminalManager.render(build_menu_frame(status_msg))
-            TerminalManager.before_input()
-            choice = input(f"\n{MC.PURPLE_GRADIENT}{MC.BOLD}└─ Escolha uma opção: {MC.RESET}").strip()
+            # Enquanto ocioso, acorda a cada MENU_REFRESH segundos e só
+            # redesenha se o quadro mudou (ex.: contagem do download)
+            frame = build_menu_frame(status_msg)
+            if frame != last_frame:
+                TerminalManager.render(frame)
+                TerminalManager.before_input()
+                choice = TerminalManager.read_key(prompt, timeout=MENU_REFRESH)
+                last_frame = frame
+            else:
+                choice = TerminalManager.read_key(timeout=MENU_REFRESH)
+            if choice is None:
+                continue
+            last_frame = None
             TerminalManager.after_input()
+            if choice in ("1", "2", "3", "4", "5", "6"):
+                # Ações podem instalar/remover o serviço: refaz o status
+                invalidate_status_box()
             if choice == "1":
                 ok, msg = executar_script_openvpn()
                 status_msg = msg if ok else f"Erro: {msg}"
@@ -784,6 +1131,8 @@ def main_menu():
             else:
                 status_msg = "Opção inválida."
     finally:
+        # Não deixa o Enter da última escolha vazar para o menu que nos chamou
+        TerminalManager.discard_input()
         TerminalManager.leave_alt_screen()
 
 # Executa menu se script for executado diretamente
@@ -7,140 +7,389 @@ import subprocess
 import signal
 import time
 import socket
+import struct
+import tempfile
+import fcntl
+import contextlib
 
 # Adiciona o diretório pai ao sys.path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from menus.menu_style_utils import Colors, BoxChars, print_colored_box, print_menu_option, clear_screen
+    from menus.menu_style_utils import Colors, BoxChars, TerminalManager, colored_box, menu_option_line, render_frame
 except ImportError:
     print("Erro: Módulo de estilo não encontrado.")
     sys.exit(1)
 
 # --- Configurações ---
-COLORS = Colors()
-SERVER_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), '..', 'ferramentas', 'servidor_download.py')
-STATE_FILE = "/tmp/download_server.state"
+COLORS = Colors
+# Caminho canônico resolvido uma vez (sem '..' nem symlinks a percorrer a cada uso)
+SERVER_SCRIPT_PATH = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'ferramentas', 'servidor_download.py'))
+# Estado em /run (tmpfs só do root), fora do alcance de outros usuários
+STATE_DIR = "/run/multiflow"
+STATE_FILE = os.path.join(STATE_DIR, "download_server.state")
+STATE_LOCK_FILE = STATE_FILE + ".lock"  # flock que serializa sessões concorrentes do menu
+LEGACY_STATE_FILE = "/tmp/download_server.state"  # Local usado por versões anteriores
 DOWNLOAD_DIR = '/opt/multiflow/downloads'
+# STATE_FILE binário: assinatura + PID + porta (tamanho fixo, um unpack só)
+STATE_MAGIC = b'MFDL'
+STATE_STRUCT = struct.Struct('<4sII')
+STATUS_TTL = 1.0  # Segundos em que o resultado de check_status() é reaproveitado
+
+IP_TTL = 30.0     # Segundos em que o IP local detectado é reaproveitado
+
+# Último resultado de check_status() e quando expira
+_status_cache = {"value": None, "exp": 0.0}
+# Último IP local detectado e quando foi obtido
+_ip_cache = {"ip": None, "ts": 0.0}
+# Último STATE_FILE decodificado: (inode, mtime_ns, tamanho) -> (pid, porta)
+_state_memo = {"sig": None, "state": None}
+# LEGACY_STATE_FILE só é procurado uma vez por processo
+_legacy_checked = {"done": False}
 
 def get_ip_address():
-    """Obtém o endereço IP local da máquina."""
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        # Não precisa ser alcançável
-        s.connect(('10.255.255.255', 1))
-        IP = s.getsockname()[0]
-    except Exception:
-        IP = '127.0.0.1'
-    finally:
-        s.close()
+    """Obtém o endereço IP local da máquina (memorizado por IP_TTL segundos)."""
+    now = time.monotonic()
+    if _ip_cache["ip"] and now - _ip_cache["ts"] < IP_TTL:
+        return _ip_cache["ip"]
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            # Não precisa ser alcançável
+            s.connect(('10.255.255.255', 1))
+            IP = s.getsockname()[0]
+        except OSError:
+            # Sem rota agora: não memoriza, tenta de novo no próximo quadro
+            return '127.0.0.1'
+    _ip_cache["ip"] = IP
+    _ip_cache["ts"] = now
     return IP
 
 def check_status():
-    """Verifica se o servidor está ativo."""
-    if not os.path.exists(STATE_FILE):
-        return ("Inativo", None)
+    """Verifica se o servidor está ativo.
+
+    O resultado é memorizado por STATUS_TTL segundos para que redesenhos
+    seguidos do menu não releiam o STATE_FILE.
+    """
+    now = time.monotonic()
+    if _status_cache["value"] is not None and now < _status_cache["exp"]:
+        return _status_cache["value"]
+    value = _read_status()
+    _status_cache["value"] = value
+    _status_cache["exp"] = now + STATUS_TTL
+    return value
+
+def invalidate_status():
+    """Descarta o status memorizado; usar após iniciar/parar o servidor."""
+    _status_cache["exp"] = 0.0
+
+def _ensure_state_dir(path):
+    """Cria o diretório de `path` (modo 0700) se ainda não existir."""
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
 
+@contextlib.contextmanager
+def _state_lock(shared=False):
+    """Trava o estado do servidor entre sessões do menu (fcntl.flock).
+
+    Usa um arquivo de trava à parte, pois o STATE_FILE é apagado ao parar
+    o servidor. Leituras usam trava compartilhada; start/stop, exclusiva.
+    O_NOFOLLOW recusa um link simbólico no lugar da trava.
+    """
+    _ensure_state_dir(STATE_LOCK_FILE)
+    fd = os.open(STATE_LOCK_FILE, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600)
     try:
-        with open(STATE_FILE, 'r') as f:
-            pid, port = f.read().strip().split(':')
-            pid = int(pid)
-    except (IOError, ValueError):
-        if os.path.exists(STATE_FILE): os.remove(STATE_FILE)
-        return ("Inativo", None)
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+def _read_status():
+    """Lê o status sob trava compartilhada.
 
+    Se o STATE_FILE não mudou desde a última leitura (mesmo inode, mtime e
+    tamanho), basta um stat e a checagem do PID: sem trava nem releitura.
+    """
     try:
-        os.kill(pid, 0)
+        st = os.stat(STATE_FILE)
+    except FileNotFoundError:
+        if _legacy_checked["done"]:
+            return ("Inativo", None)
+        st = None  # Ainda pode haver estado antigo em /tmp: _load_state migra
+    if st is not None and _state_memo["sig"] == (st.st_ino, st.st_mtime_ns, st.st_size):
+        pid, port = _state_memo["state"]
+        if _is_server_pid(pid):
+            return ("Ativo", port)
+    with _state_lock(shared=True):
+        return _probe_state()
+
+def _probe_state():
+    """Lê o STATE_FILE e confirma se o processo registrado está vivo.
+
+    Deve ser chamado com _state_lock() já adquirida.
+    """
+    try:
+        state = _load_state()
+    except FileNotFoundError:
+        return ("Inativo", None)
+    except (OSError, ValueError):
+        _discard_state()
+        return ("Inativo", None)
+    pid, port = state
+
+    if _is_server_pid(pid):
         return ("Ativo", port)
+    _discard_state()
+    return ("Inativo", None)
+
+def _is_server_pid(pid):
+    """Retorna True se o PID ainda é o nosso servidor de download.
+
+    Lê /proc/<pid>/cmdline em vez de só testar a existência do PID: após
+    reuso de PID, outro processo qualquer não é tomado pelo servidor. Um
+    zumbi tem cmdline vazio e também conta como parado.
+    """
+    try:
+        with open(f"/proc/{pid}/cmdline", 'rb') as f:
+            cmdline = f.read()
     except OSError:
-        if os.path.exists(STATE_FILE): os.remove(STATE_FILE)
-        return ("Inativo", None)
+        return False
+    return os.fsencode(SERVER_SCRIPT_PATH) in cmdline
+
+def _load_state():
+    """Retorna (pid, porta) do STATE_FILE.
+
+    Levanta FileNotFoundError se não houver servidor registrado e
+    ValueError se o conteúdo não for um estado válido.
+    """
+    # Abre direto: a ausência do arquivo já é a resposta, sem exists() antes.
+    # os.open/os.read: para 12 bytes não vale montar um objeto de arquivo.
+    try:
+        fd = os.open(STATE_FILE, os.O_RDONLY | os.O_CLOEXEC)
+    except FileNotFoundError:
+        if not _migrate_legacy_state():
+            raise
+        fd = os.open(STATE_FILE, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        st = os.fstat(fd)
+        data = os.read(fd, STATE_STRUCT.size + 1)
+    finally:
+        os.close(fd)
+    if len(data) != STATE_STRUCT.size:
+        raise ValueError("estado com tamanho inválido")
+    magic, pid, port = STATE_STRUCT.unpack(data)
+    if magic != STATE_MAGIC:
+        raise ValueError("estado com assinatura inválida")
+    state = (pid, str(port))
+    _state_memo["sig"] = (st.st_ino, st.st_mtime_ns, st.st_size)
+    _state_memo["state"] = state
+    return state
+
+def _migrate_legacy_state():
+    """Traz para o STATE_FILE o servidor registrado em LEGACY_STATE_FILE.
+
+    Roda uma vez por processo. Aceita o formato texto "pid:porta" e o
+    binário; só migra se o PID ainda for o nosso servidor. O arquivo
+    antigo é apagado em qualquer caso. Retorna True se migrou.
+    """
+    if _legacy_checked["done"]:
+        return False
+    _legacy_checked["done"] = True
+    try:
+        fd = os.open(LEGACY_STATE_FILE, os.O_RDONLY | os.O_NOFOLLOW | os.O_CLOEXEC)
+    except OSError:
+        return False
+    try:
+        data = os.read(fd, 64)
+    finally:
+        os.close(fd)
+    with contextlib.suppress(OSError):
+        os.remove(LEGACY_STATE_FILE)
+    try:
+        if len(data) == STATE_STRUCT.size and data[:4] == STATE_MAGIC:
+            _, pid, port = STATE_STRUCT.unpack(data)
+        else:
+            pid, port = data.decode().strip().split(':')
+            pid, port = int(pid), int(port)
+    except (UnicodeDecodeError, ValueError):
+        return False
+    if not _is_server_pid(pid):
+        return False
+    _save_state(pid, port)
+    return True
+
+def _save_state(pid, port):
+    """Registra o PID e a porta do servidor no STATE_FILE.
+
+    Grava num temporário com um único os.write e o renomeia por cima:
+    leitores nunca veem um registro pela metade. O temporário vem de
+    mkstemp (O_EXCL | O_NOFOLLOW), então um link pré-criado não desvia a
+    escrita.
+    """
+    _ensure_state_dir(STATE_FILE)
+    fd, tmp = tempfile.mkstemp(prefix=".download_server.", dir=os.path.dirname(STATE_FILE))
+    try:
+        try:
+            os.write(fd, STATE_STRUCT.pack(STATE_MAGIC, pid, int(port)))
+        finally:
+            os.close(fd)
+        os.replace(tmp, STATE_FILE)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+def _discard_state():
+    """Remove o STATE_FILE, ignorando se ele já não existir."""
+    try:
+        os.remove(STATE_FILE)
+    except FileNotFoundError:
+        pass
+
+def _spawn_server(port):
+    """Dispara o servidor em background e retorna o PID.
+
+    Usa os.posix_spawn (sem o fork copy-on-write do processo do menu) em
+    modo isolado (-I -S), já que o servidor só depende da stdlib. A saída
+    vai para /dev/null e o filho fica em sessão própria.
+    """
+    argv = [sys.executable, '-I', '-S', SERVER_SCRIPT_PATH, str(port)]
+    if not hasattr(os, 'posix_spawn'):
+        return subprocess.Popen(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                start_new_session=True).pid
+    file_actions = [
+        (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+        (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+        (os.POSIX_SPAWN_DUP2, 1, 2),
+    ]
+    return os.posix_spawn(sys.executable, argv, os.environ, file_actions=file_actions, setsid=True)
 
 def start_server():
-    """Inicia o servidor de upload/download."""
+    """Inicia o servidor de upload/download.
+
+    Retorna a mensagem a ser exibida no próximo redesenho do menu.
+    """
     status, port = check_status()
     if status == "Ativo":
-        print(f"\n{COLORS.YELLOW}O servidor já está ativo na porta {port}.{COLORS.END}")
-        return
+        return f"{COLORS.YELLOW}O servidor já está ativo na porta {port}.{COLORS.END}"
 
     try:
-        new_port = input(f"{COLORS.CYAN}Digite a porta para o servidor (ex: 8080): {COLORS.END}").strip()
+        new_port = TerminalManager.read_line(f"{COLORS.CYAN}Digite a porta para o servidor (ex: 8080): {COLORS.END}")
         if not new_port.isdigit() or not (1 <= int(new_port) <= 65535):
-            print(f"\n{COLORS.RED}Porta inválida.{COLORS.END}")
-            return
+            return f"{COLORS.RED}Porta inválida.{COLORS.END}"
         
         os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-        
-        process = subprocess.Popen([sys.executable, SERVER_SCRIPT_PATH, new_port], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        
-        with open(STATE_FILE, 'w') as f:
-            f.write(f"{process.pid}:{new_port}")
-            
-        ip = get_ip_address()
-        print(f"\n{COLORS.GREEN}Servidor iniciado com sucesso!{COLORS.END}")
-        print(f"{COLORS.YELLOW}Acesse a página de upload em: http://{ip}:{new_port}{COLORS.END}")
+
+        # Reconfere sob trava exclusiva: outra sessão pode ter iniciado um servidor
+        with _state_lock():
+            status, port = _probe_state()
+            if status == "Ativo":
+                invalidate_status()
+                return f"{COLORS.YELLOW}O servidor já está ativo na porta {port}.{COLORS.END}"
+            pid = _spawn_server(new_port)
+            _save_state(pid, new_port)
+        invalidate_status()
+
+        return f"{COLORS.GREEN}Servidor iniciado com sucesso!{COLORS.END}"
 
     except Exception as e:
-        print(f"\n{COLORS.RED}Ocorreu um erro ao iniciar o servidor: {e}{COLORS.END}")
+        return f"{COLORS.RED}Ocorreu um erro ao iniciar o servidor: {e}{COLORS.END}"
+
+def _reap(pid, attempts=20, interval=0.05):
+    """Recolhe o processo filho após o SIGTERM para não deixar zumbi.
+
+    Espera até attempts*interval segundos; se ele não sair, envia SIGKILL.
+    Se o PID não for filho deste processo (menu reaberto), não há o que
+    recolher.
+    """
+    for _ in range(attempts):
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if done == pid:
+            return
+        time.sleep(interval)
+    try:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    except (ProcessLookupError, ChildProcessError):
+        pass
 
 def stop_server():
-    """Para o processo do servidor."""
-    status, _ = check_status()
-    if status == "Inativo":
-        print(f"\n{COLORS.YELLOW}O servidor já está inativo.{COLORS.END}")
-        return
+    """Para o processo do servidor e retorna a mensagem para o menu."""
+    # Uma leitura do estado, um kill e a remoção, tudo sob trava exclusiva
+    with _state_lock():
+        try:
+            pid, _ = _load_state()
+        except FileNotFoundError:
+            pid = None
+        except (OSError, ValueError):
+            _discard_state()
+            pid = None
+        if pid is None or not _is_server_pid(pid):
+            _discard_state()
+            invalidate_status()
+            return f"{COLORS.YELLOW}O servidor já está inativo.{COLORS.END}"
 
-    with open(STATE_FILE, 'r') as f:
-        pid, port = f.read().strip().split(':')
-        pid = int(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+            _reap(pid)
+            return f"{COLORS.GREEN}Servidor (PID: {pid}) finalizado com sucesso.{COLORS.END}"
+        except OSError:
+            return f"{COLORS.YELLOW}O processo com PID {pid} não foi encontrado.{COLORS.END}"
+        finally:
+            _discard_state()
+            invalidate_status()
 
-    try:
-        os.kill(pid, signal.SIGTERM)
-        print(f"\n{COLORS.GREEN}Servidor (PID: {pid}) finalizado com sucesso.{COLORS.END}")
-    except OSError:
-        print(f"\n{COLORS.YELLOW}O processo com PID {pid} não foi encontrado.{COLORS.END}")
-    finally:
-        if os.path.exists(STATE_FILE):
-            os.remove(STATE_FILE)
+# Trechos fixos do menu: só dois status possíveis e opções que não mudam
+_STATUS_LINES = {
+    "Ativo": f"Status: {COLORS.GREEN}Ativo{COLORS.END}",
+    "Inativo": f"Status: {COLORS.RED}Inativo{COLORS.END}",
+}
+_URL_LINE = f"URL de Acesso: {COLORS.YELLOW}http://{{ip}}:{{port}}{COLORS.END}"
+_DIR_LINE = f"Diretório de Arquivos: {COLORS.CYAN}{DOWNLOAD_DIR}{COLORS.END}"
+_MENU_LINES = "".join([
+    menu_option_line("1", "Iniciar Servidor", color=COLORS.CYAN),
+    menu_option_line("2", "Parar Servidor", color=COLORS.CYAN),
+    menu_option_line("0", "Voltar ao Menu Anterior", color=COLORS.YELLOW),
+    f"{BoxChars.BOTTOM_LEFT}{BoxChars.HORIZONTAL * 58}{BoxChars.BOTTOM_RIGHT}\n",
+])
 
 def main():
     """Loop principal do menu de gerenciamento."""
     if os.geteuid() != 0:
         print(f"{COLORS.RED}Este script deve ser executado como root.{COLORS.END}")
         sys.exit(1)
-        
+
+    # Resultado da última ação; fica visível até a próxima, sem pausa "Enter"
+    message = ""
     while True:
-        clear_screen()
         status, port = check_status()
         
-        status_color = COLORS.GREEN if status == "Ativo" else COLORS.RED
-        status_text = f"{status_color}{status}{COLORS.END}"
-        
-        info_lines = [f"Status: {status_text}"]
         if status == "Ativo":
-            ip = get_ip_address()
-            info_lines.append(f"URL de Acesso: {COLORS.YELLOW}http://{ip}:{port}{COLORS.END}")
-        
-        info_lines.append(f"Diretório de Arquivos: {COLORS.CYAN}{DOWNLOAD_DIR}{COLORS.END}")
+            info_lines = [_STATUS_LINES[status],
+                          _URL_LINE.format(ip=get_ip_address(), port=port),
+                          _DIR_LINE]
+        else:
+            info_lines = [_STATUS_LINES[status], _DIR_LINE]
 
-        print_colored_box("SERVIDOR DE UPLOAD & DOWNLOAD", info_lines)
-        print_menu_option("1", "Iniciar Servidor", color=COLORS.CYAN)
-        print_menu_option("2", "Parar Servidor", color=COLORS.CYAN)
-        print_menu_option("0", "Voltar ao Menu Anterior", color=COLORS.YELLOW)
-        print(f"{BoxChars.BOTTOM_LEFT}{BoxChars.HORIZONTAL * 58}{BoxChars.BOTTOM_RIGHT}")
+        # Quadro inteiro montado em memória e enviado num único write
+        frame = [colored_box("SERVIDOR DE UPLOAD & DOWNLOAD", info_lines), _MENU_LINES]
+        if message:
+            frame.append(f"\n{message}\n")
+        render_frame(frame, clear=True)
 
-        choice = input(f"\n{COLORS.BOLD}Escolha uma opção: {COLORS.END}")
+        choice = TerminalManager.read_key(f"\n{COLORS.BOLD}Escolha uma opção: {COLORS.END}")
         
         if choice == '1':
-            start_server()
+            message = start_server()
         elif choice == '2':
-            stop_server()
+            message = stop_server()
         elif choice == '0':
+            # Não deixa o Enter da escolha vazar para o menu que nos chamou
+            TerminalManager.discard_input()
             break
         else:
-            print(f"\n{COLORS.RED}Opção inválida. Tente novamente.{COLORS.END}")
-        
-        input(f"\n{COLORS.BOLD}Pressione Enter para continuar...{COLORS.END}")
+            message = f"{COLORS.RED}Opção inválida. Tente novamente.{COLORS.END}"
 
 if __name__ == '__main__':
     main()
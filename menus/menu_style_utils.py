@@ -3,8 +3,17 @@
 
 import os
 import re
+import functools
 import sys
 import shutil
+import select
+import time
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows: sem termios, read_key recorre a input()
+    termios = tty = None
 
 # ====== Compatibilidade: classe Colors antiga (usada por scripts legados) ======
 def _supports_color():
@@ -16,70 +25,137 @@ def _supports_color():
         is_a_tty = False
     return supported_platform and is_a_tty
 
+# Detectado uma vez no import: Colors e BoxChars sempre concordam entre si
+_SUPPORTS_COLOR = _supports_color()
+
 class Colors:
-    _enabled = _supports_color()
-    @classmethod
-    def _get(cls, code): return code if cls._enabled else ''
-    HEADER = property(lambda self: self._get('\033[95m'))
-    BLUE = property(lambda self: self._get('\033[94m'))
-    CYAN = property(lambda self: self._get('\033[96m'))
-    GREEN = property(lambda self: self._get('\033[92m'))
-    YELLOW = property(lambda self: self._get('\033[93m'))
-    RED = property(lambda self: self._get('\033[91m'))
-    WHITE = property(lambda self: self._get('\033[97m'))
-    BOLD = property(lambda self: self._get('\033[1m'))
-    UNDERLINE = property(lambda self: self._get('\033[4m'))
-    END = property(lambda self: self._get('\033[0m'))
+    # Os códigos viram atributos simples conforme _SUPPORTS_COLOR
+    _enabled = _SUPPORTS_COLOR
+    HEADER = '\033[95m' if _enabled else ''
+    BLUE = '\033[94m' if _enabled else ''
+    CYAN = '\033[96m' if _enabled else ''
+    GREEN = '\033[92m' if _enabled else ''
+    YELLOW = '\033[93m' if _enabled else ''
+    RED = '\033[91m' if _enabled else ''
+    WHITE = '\033[97m' if _enabled else ''
+    BOLD = '\033[1m' if _enabled else ''
+    UNDERLINE = '\033[4m' if _enabled else ''
+    END = '\033[0m' if _enabled else ''
 
 class BoxChars:
-    if _supports_color():
+    if _SUPPORTS_COLOR:
         TOP_LEFT='╔'; TOP_RIGHT='╗'; BOTTOM_LEFT='╚'; BOTTOM_RIGHT='╝'
         HORIZONTAL='═'; VERTICAL='║'; T_DOWN='╦'; T_UP='╩'; T_RIGHT='╠'; T_LEFT='╣'; CROSS='╬'
     else:
         TOP_LEFT=TOP_RIGHT=BOTTOM_LEFT=BOTTOM_RIGHT='+'
         HORIZONTAL='-'; VERTICAL='|'; T_DOWN=T_UP=T_RIGHT=T_LEFT=CROSS='+'
 
+# Sequências ANSI (qualquer escape / só SGR de cor), compiladas uma vez
+_ANSI_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+_ANSI_SGR_RE = re.compile(r'\033\[[0-9;]*m')
+
 def visible_length(text):
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return len(ansi_escape.sub('', text))
+    # Sem ESC não há escape a remover: evita passar pelo regex
+    if '\x1b' not in text:
+        return len(text)
+    # Desconta os escapes sem montar a string limpa
+    return len(text) - sum(m.end() - m.start() for m in _ANSI_RE.finditer(text))
+
+def truncate_visible(text, limit):
+    """Corta text após limit caracteres visíveis, sem partir escapes ANSI.
+
+    Varre os escapes uma vez e copia fatias inteiras entre eles; se algum
+    escape ficou no trecho mantido, fecha com um reset de cor.
+    """
+    if '\x1b' not in text:
+        return text[:limit]
+    out = []; cursor = 0; left = limit
+    for m in _ANSI_RE.finditer(text):
+        run = m.start() - cursor
+        if run >= left:
+            break
+        out.append(text[cursor:m.end()])
+        left -= run; cursor = m.end()
+    out.append(text[cursor:cursor + left])
+    if cursor:
+        out.append('\033[0m')
+    return "".join(out)
+
+@functools.lru_cache(maxsize=64)
+def _rep(char, n):
+    """char*n memorizado: bordas de mesma largura se repetem a cada quadro."""
+    return char * n
+
+# Cursor ao topo e limpa a tela; sem \033[3J, o scrollback é preservado
+CLEAR_SEQ = "\033[H\033[2J"
 
 def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
+    # Escreve a sequência direto em vez de um fork+exec de /usr/bin/clear
+    if os.name == "nt":
+        os.system("cls")
+        return
+    sys.stdout.write(CLEAR_SEQ)
+    sys.stdout.flush()
 
 def print_centered(text, width=60, char=' '):
     print(text.center(width, char))
 
-def print_colored_box(title, content_lines=None, width=60, title_color=None):
+def colored_box(title, content_lines=None, width=60, title_color=None):
+    """Monta a caixa do estilo legado como uma única string."""
     if content_lines is None: content_lines = []
-    col = Colors()
+    col = Colors  # Códigos já resolvidos na classe: sem instância por chamada
     if title_color is None: title_color = col.CYAN
-    print(f"{BoxChars.TOP_LEFT}{BoxChars.HORIZONTAL*(width-2)}{BoxChars.TOP_RIGHT}")
+    out = [f"{BoxChars.TOP_LEFT}{_rep(BoxChars.HORIZONTAL, width-2)}{BoxChars.TOP_RIGHT}\n"]
     title_text = f" {title_color}{col.BOLD}{title}{col.END} "
     pad = width - visible_length(title_text) - 2
     lpad = pad//2; rpad = pad-lpad
-    print(f"{BoxChars.VERTICAL}{' '*lpad}{title_text}{' '*rpad}{BoxChars.VERTICAL}")
+    out.append(f"{BoxChars.VERTICAL}{_rep(' ', lpad)}{title_text}{_rep(' ', rpad)}{BoxChars.VERTICAL}\n")
     if content_lines:
-        print(f"{BoxChars.T_RIGHT}{BoxChars.HORIZONTAL*(width-2)}{BoxChars.T_LEFT}")
+        out.append(f"{BoxChars.T_RIGHT}{_rep(BoxChars.HORIZONTAL, width-2)}{BoxChars.T_LEFT}\n")
+        # Constantes do laço resolvidas uma vez por caixa
+        maxw = width-4
+        left = BoxChars.VERTICAL + " "; right = BoxChars.VERTICAL + "\n"
         for line in content_lines:
-            maxw = width-4
             vis = visible_length(line)
             if vis>maxw:
-                line = line[:maxw-3] + "..."
-            pad = width - visible_length(line) - 2
-            print(f"{BoxChars.VERTICAL} {line}{' '*pad}{BoxChars.VERTICAL}")
-    print(f"{BoxChars.BOTTOM_LEFT}{BoxChars.HORIZONTAL*(width-2)}{BoxChars.BOTTOM_RIGHT}")
+                line = truncate_visible(line, maxw-3) + "..."
+                vis = maxw
+            # Borda + espaço à esquerda + borda: 3 colunas fora do texto
+            out.append(f"{left}{line}{_rep(' ', width - vis - 3)}{right}")
+    out.append(f"{BoxChars.BOTTOM_LEFT}{_rep(BoxChars.HORIZONTAL, width-2)}{BoxChars.BOTTOM_RIGHT}\n")
+    return "".join(out)
 
-def print_menu_option(number, description, status=None, color=None, width=60):
-    col = Colors()
+def print_colored_box(title, content_lines=None, width=60, title_color=None):
+    sys.stdout.write(colored_box(title, content_lines, width, title_color))
+
+def menu_option_line(number, description, status=None, color=None, width=60):
+    """Linha de opção do estilo legado, com quebra de linha."""
+    col = Colors
     if color is None: color = col.WHITE
     number_text = f"{col.BOLD}{color}[{number}]{col.END}"
     option_text = f" {number_text} {description}"
     if status:
-        padding = width - visible_length(option_text) - visible_length(status) - 2
-        print(f"{BoxChars.VERTICAL}{option_text}{' '*padding}{status} {BoxChars.VERTICAL}")
-    else:
-        padding = width - visible_length(option_text) - 2
-        print(f"{BoxChars.VERTICAL}{option_text}{' '*padding}{BoxChars.VERTICAL}")
+        padding = width - visible_length(option_text) - visible_length(status) - 3
+        return f"{BoxChars.VERTICAL}{option_text}{_rep(' ', padding)}{status} {BoxChars.VERTICAL}\n"
+    padding = width - visible_length(option_text) - 2
+    return f"{BoxChars.VERTICAL}{option_text}{_rep(' ', padding)}{BoxChars.VERTICAL}\n"
+
+def print_menu_option(number, description, status=None, color=None, width=60):
+    sys.stdout.write(menu_option_line(number, description, status, color, width))
+
+def render_frame(parts, clear=False):
+    """Escreve todas as partes de um quadro com um único write + flush.
+
+    Com clear=True a limpeza da tela vai no mesmo write (exceto no Windows,
+    onde ainda depende de `cls`).
+    """
+    head = ""
+    if clear:
+        if os.name == "nt":
+            os.system("cls")
+        else:
+            head = CLEAR_SEQ
+    sys.stdout.write(head + "".join(parts)); sys.stdout.flush()
 
 # ====== Sistema moderno (estilo do multiflow.py) ======
 class MC:
@@ -107,6 +183,7 @@ class Icons:
 
 class TerminalManager:
     _in_alt = False; USE_ALT = True
+    _cursor_hidden = False  # Estado do cursor visto por before_input/after_input
     @staticmethod
     def size():
         ts = shutil.get_terminal_size(fallback=(80, 24)); return ts.columns, ts.lines
@@ -117,44 +194,166 @@ class TerminalManager:
     def enter_alt_screen():
         if TerminalManager.USE_ALT and not TerminalManager._in_alt:
             sys.stdout.write("\033[?1049h"); sys.stdout.flush(); TerminalManager._in_alt = True
+        # Scripts externos podem ter mexido no cursor: o estado memorizado não vale mais
+        TerminalManager._cursor_hidden = False
     @staticmethod
     def leave_alt_screen():
         if TerminalManager._in_alt:
             sys.stdout.write("\033[?1049l"); sys.stdout.flush(); TerminalManager._in_alt = False
+        TerminalManager._cursor_hidden = False
     @staticmethod
     def render(frame_str):
-        sys.stdout.write("\033[?25l"); TerminalManager.clear(); sys.stdout.write(frame_str); sys.stdout.flush()
+        # Oculta cursor, limpa e desenha o quadro num único write(); o ?25l vai
+        # sempre, pois outro código pode ter mostrado o cursor sem avisar
+        TerminalManager._cursor_hidden = True
+        TerminalManager.write_frame("\033[?25l\033[2J\033[H" + frame_str)
+    @staticmethod
+    def write_frame(data):
+        """Envia o texto ao terminal com o mínimo de syscalls (sem tearing)."""
+        sys.stdout.flush()
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, ValueError, OSError):
+            sys.stdout.write(data); sys.stdout.flush(); return
+        buf = memoryview(data.encode(sys.stdout.encoding or "utf-8", errors="replace"))
+        while buf:
+            buf = buf[os.write(fd, buf):]
     @staticmethod
     def before_input():
-        sys.stdout.write("\033[?25h\033[2K\r"); sys.stdout.flush()
+        show = "\033[?25h" if TerminalManager._cursor_hidden else ""
+        TerminalManager._cursor_hidden = False
+        sys.stdout.write(show + "\033[2K\r"); sys.stdout.flush()
     @staticmethod
     def after_input():
-        sys.stdout.write("\033[?25l"); sys.stdout.flush()
+        if not TerminalManager._cursor_hidden:
+            TerminalManager._cursor_hidden = True
+            sys.stdout.write("\033[?25l"); sys.stdout.flush()
+    # Quem digita "1⏎" num menu de tecla única deixa um Enter para trás; ele
+    # chega logo após a tecla e é descartado se vier dentro desta janela
+    ENTER_GRACE = 0.3
+    _last_key_at = float("-inf")
+    @staticmethod
+    def _tty_fd():
+        """Retorna o fd do stdin se for um terminal com termios, senão None."""
+        if termios is None:
+            return None
+        try:
+            fd = sys.stdin.fileno()
+            return fd if os.isatty(fd) else None
+        except (AttributeError, ValueError, OSError):
+            return None
+    @staticmethod
+    def read_key(prompt="", timeout=None):
+        """Lê uma única tecla sem esperar Enter (modo cbreak).
+
+        Para menus de opção de um caractere. Se a entrada não for um
+        terminal (ou não houver termios), recorre a input(). Com timeout
+        (segundos), retorna None se nada for digitado nesse intervalo,
+        permitindo ao menu se redesenhar sozinho. Após ler uma tecla, o que
+        sobrar na fila de entrada é descartado, para não vazar para o
+        próximo prompt.
+        """
+        sys.stdout.write(prompt); sys.stdout.flush()
+        fd = TerminalManager._tty_fd()
+        if fd is None:
+            if timeout is not None and termios is not None:
+                try:
+                    if not select.select([sys.stdin], [], [], timeout)[0]:
+                        return None
+                except (ValueError, OSError):
+                    pass
+            return input().strip()
+        old = termios.tcgetattr(fd)
+        data = None
+        try:
+            # TCSANOW: o padrão TCSAFLUSH jogaria fora teclas digitadas entre leituras
+            tty.setcbreak(fd, termios.TCSANOW)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if wait is not None and not select.select([fd], [], [], wait)[0]:
+                    return None
+                # Lê o que estiver disponível para não deixar restos de sequências (setas etc.)
+                data = os.read(fd, 32)
+                # Enter atrasado da escolha anterior ("1⏎"): ignora e continua esperando
+                if (data and not data.strip(b"\r\n")
+                        and time.monotonic() - TerminalManager._last_key_at < TerminalManager.ENTER_GRACE):
+                    continue
+                break
+        finally:
+            # Só descarta a fila se uma tecla foi lida: num timeout, o que for
+            # digitado agora pertence à próxima leitura
+            if data:
+                termios.tcflush(fd, termios.TCIFLUSH)
+            termios.tcsetattr(fd, termios.TCSADRAIN, old)
+        if not data:
+            raise EOFError
+        TerminalManager._last_key_at = time.monotonic()
+        key = data[:1].decode(errors="ignore")
+        key = key if key.isprintable() else ""
+        sys.stdout.write(key + "\n"); sys.stdout.flush()
+        return key
+    @staticmethod
+    def discard_input():
+        """Descarta entrada pendente antes de um prompt em modo linha.
+
+        Se uma tecla acabou de ser lida por read_key, espera até
+        ENTER_GRACE após ela pelo Enter que costuma vir junto.
+        """
+        fd = TerminalManager._tty_fd()
+        if fd is None:
+            return
+        remaining = TerminalManager._last_key_at + TerminalManager.ENTER_GRACE - time.monotonic()
+        if remaining > 0:
+            # Em modo linha o fd só fica legível quando chega um Enter
+            select.select([fd], [], [], remaining)
+        termios.tcflush(fd, termios.TCIFLUSH)
+    @staticmethod
+    def read_line(prompt=""):
+        """Lê uma linha inteira (modo normal, com Enter) para sub-prompts.
+
+        Descarta antes o que sobrou da escolha de menu (ex.: o Enter de "1⏎").
+        """
+        TerminalManager.discard_input()
+        return input(prompt).strip()
 
 def gradient_line(width=80, char='═', colors=(MC.PURPLE_GRADIENT, MC.CYAN_GRADIENT, MC.BLUE_GRADIENT)):
-    seg = max(1, width // len(colors)); out=[]; used=0
+    seg = max(1, width // len(colors))
+    if len(colors) == 3:
+        # Caso padrão: um f-string só, sem lista intermediária
+        c1, c2, c3 = colors
+        return f"{c1}{_rep(char, seg)}{c2}{_rep(char, seg)}{c3}{_rep(char, width - 2*seg)}{MC.RESET}\n"
+    out=[]; used=0
     for i,c in enumerate(colors):
         run = seg if i < len(colors)-1 else (width - used)
-        out.append(f"{c}{char*run}"); used += run
+        out.append(f"{c}{_rep(char, run)}"); used += run
     return "".join(out) + MC.RESET + "\n"
 
 def modern_box(title, content_lines, icon="", primary=MC.CYAN_GRADIENT, secondary=MC.CYAN_LIGHT):
     cols,_ = TerminalManager.size(); width = max(54, min(cols-6, 100))
     t = f" {icon}{title} " if icon else f" {title} "
-    header = (f"{primary}{Icons.BOX_TOP_LEFT}{Icons.BOX_HORIZONTAL*10}"
+    header = (f"{primary}{Icons.BOX_TOP_LEFT}{_rep(Icons.BOX_HORIZONTAL, 10)}"
               f"{secondary}┤{MC.BOLD}{MC.WHITE}{t}{MC.RESET}{secondary}├"
-              f"{primary}{Icons.BOX_HORIZONTAL*(width-len(t)-12)}{Icons.BOX_TOP_RIGHT}{MC.RESET}\n")
-    body=""
+              f"{primary}{_rep(Icons.BOX_HORIZONTAL, width-len(t)-12)}{Icons.BOX_TOP_RIGHT}{MC.RESET}\n")
+    # Bordas laterais e largura interna calculadas uma vez por caixa
+    left = f"{primary}{Icons.BOX_VERTICAL}{MC.RESET} "
+    right = f" {primary}{Icons.BOX_VERTICAL}{MC.RESET}\n"
+    interior = width - 2
+    body = []
     for line in (content_lines or []):
-        clean = re.sub(r'\033\[[0-9;]*m','',line)
-        pad = width - len(clean) - 2
-        if pad < 0:
+        clean = _ANSI_SGR_RE.sub('', line) if '\x1b' in line else line
+        if len(clean) > interior:
             vis = clean[:width-5] + "..."
-            line = line.replace(clean, vis)
-            pad = width - len(vis) - 2
-        body += f"{primary}{Icons.BOX_VERTICAL}{MC.RESET} {line}{' '*pad} {primary}{Icons.BOX_VERTICAL}{MC.RESET}\n"
-    footer = f"{primary}{Icons.BOX_BOTTOM_LEFT}{Icons.BOX_HORIZONTAL*width}{Icons.BOX_BOTTOM_RIGHT}{MC.RESET}\n"
-    return header+body+footer
+            if clean in line:
+                line = line.replace(clean, vis)
+            else:
+                # Cores no meio do texto: corta pelos escapes, sem partir nenhum
+                line = truncate_visible(line, width-5) + "..."
+            clean = vis
+        # ljust conta os bytes de cor: soma-os à largura visível
+        body.append(f"{left}{line.ljust(interior + len(line) - len(clean))}{right}")
+    footer = f"{primary}{Icons.BOX_BOTTOM_LEFT}{_rep(Icons.BOX_HORIZONTAL, width)}{Icons.BOX_BOTTOM_RIGHT}{MC.RESET}\n"
+    return header + "".join(body) + footer
 
 def menu_option(number, text, icon="", color=MC.CYAN_GRADIENT, badge=""):
     num = f"{color}{MC.BOLD}[{number}]{MC.RESET}" if number!="0" else f"{MC.RED_GRADIENT}{MC.BOLD}[0]{MC.RESET}"
@@ -163,11 +362,12 @@ def menu_option(number, text, icon="", color=MC.CYAN_GRADIENT, badge=""):
 
 def footer_line(status_msg=""):
     cols,_ = TerminalManager.size(); width = max(60, min(cols-2, 100))
-    bar = f"\n{MC.DARK_GRAY}{'─'*width}{MC.RESET}\n"
+    bar = f"\n{MC.DARK_GRAY}{_rep('─', width)}{MC.RESET}\n"
     status = f"{MC.GRAY}MultiFlow │ Sistema Avançado de Gerenciamento VPS{MC.RESET}"
     if status_msg: status += f"  {MC.YELLOW_GRADIENT}{status_msg}{MC.RESET}"
-    return bar + status + "\n" + f"{MC.DARK_GRAY}{'─'*width}{MC.RESET}\n"
+    return bar + status + "\n" + f"{MC.DARK_GRAY}{_rep('─', width)}{MC.RESET}\n"
 
 def simple_header(title):
     cols,_ = TerminalManager.size(); width = max(60, min(cols-2, 100))
-    return "".join([gradient_line(width), f"{MC.CYAN_GRADIENT}{MC.BOLD}{title.center(width)}{MC.RESET}\n", f"{MC.GRAY}{'═'*width}{MC.RESET}\n\n"])
+    return (f"{gradient_line(width)}{MC.CYAN_GRADIENT}{MC.BOLD}{title.center(width)}{MC.RESET}\n"
+            f"{MC.GRAY}{_rep('═', width)}{MC.RESET}\n\n")
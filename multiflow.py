@@ -8,13 +8,14 @@ if True:
     import time  # Para delays e temporizações
     import re  # Para expressões regulares, usado em limpeza de texto
     import subprocess  # Para execução de comandos externos
-    import psutil  # Para monitoramento de recursos do sistema (CPU, RAM)
     import shutil  # Para obter tamanho do terminal
-    from datetime import datetime  # Para manipulação de datas e tempos
     import random  # Para escolhas aleatórias, como mensagens de boas-vindas
     import importlib  # Para importação dinâmica de módulos
     import importlib.util  # Para especificações de módulos a partir de arquivos
 
+    # Diretório real do script, resolvido uma vez (realpath segue symlinks no disco)
+    _SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+
     # ==================== BOOTSTRAP DE IMPORTAÇÃO ====================
     # Esta seção localiza a raiz do projeto e importa módulos necessários 
     # dinamicamente.
@@ -33,8 +34,7 @@ if True:
 
         # 3) Diretório do script e ascendentes
         try:
-            script_dir = os.path.dirname(os.path.realpath(__file__))  # 
-            # Diretório atual do script
+            script_dir = _SCRIPT_DIR  # Diretório atual do script
             candidates.append(script_dir)
             # Subir níveis na hierarquia de diretórios
             parent = script_dir
@@ -195,23 +195,25 @@ if True:
                 TerminalManager._in_alt = False  # Atualiza flag
 
         @staticmethod
-        def _manual_clear_all_cells():
+        def _clear_cells_seq():
             cols, lines = TerminalManager.size()  # Obtém tamanho
             blank_line = " " * cols  # Linha em branco
-            sys.stdout.write("\033[0m\033[?7l")  # Reset e desativa wrap
-            for row in range(1, lines + 1):
-                sys.stdout.write(f"\033[{row};1H{blank_line}")  # Limpa cada 
-                # linha
-            sys.stdout.write("\033[1;1H\033[?7h")  # Volta ao topo e ativa wrap
+            # Reset e desativa wrap, limpa cada linha, volta ao topo e ativa wrap
+            return ("\033[0m\033[?7l"
+                    + "".join(f"\033[{row};1H{blank_line}" for row in range(1, lines + 1))
+                    + "\033[1;1H\033[?7h")
+
+        @staticmethod
+        def _manual_clear_all_cells():
+            sys.stdout.write(TerminalManager._clear_cells_seq())
             sys.stdout.flush()
 
         @staticmethod
         def render(frame_str):
-            sys.stdout.write("\033[?25l")  # Esconde cursor
-            sys.stdout.flush()
-            TerminalManager._manual_clear_all_cells()  # Limpa tela
-            sys.stdout.write("\033[1;1H")  # Posiciona no topo
-            sys.stdout.write(frame_str)  # Escreve o frame
+            # Esconde cursor, limpa, posiciona no topo e escreve o frame:
+            # tudo numa única escrita e num único flush
+            sys.stdout.write("\033[?25l" + TerminalManager._clear_cells_seq()
+                             + "\033[1;1H" + frame_str)
             sys.stdout.flush()
 
         @staticmethod
@@ -305,6 +307,8 @@ if True:
     # ==================== HELPERS DE UI (RETORNAM STRING) ====================
     # Funções auxiliares para construir elementos da interface de usuário.
 
+    _ANSI_SGR_RE = re.compile(r'\033\[[0-9;]*m')  # Códigos de cor, compilado uma vez
+
     # Função para criar linha gradiente
     def gradient_line(width=80, char='═', colors=(MC.PURPLE_GRADIENT, 
     MC.CYAN_GRADIENT, MC.BLUE_GRADIENT)):
@@ -318,30 +322,36 @@ if True:
             used += run
         return "".join(out) + MC.RESET + "\n"  # Retorna linha com reset
 
+    # Linhas do logo colorido (constantes: montadas uma vez no carregamento)
+    # Constrói as linhas do logo como strings únicas para evitar quebras indesejadas.
+    _LOGO_LINES = [
+        f"{MC.PURPLE_LIGHT}███╗   ███╗{MC.CYAN_LIGHT}██╗   ██╗{MC.BLUE_LIGHT}██╗  ████████╗{MC.GREEN_LIGHT}██╗███████╗{MC.ORANGE_LIGHT}██╗      {MC.PINK_LIGHT}██████╗ {MC.YELLOW_LIGHT}██╗    ██╗{MC.RESET}",
+        f"{MC.PURPLE_GRADIENT}████╗ ████║{MC.CYAN_GRADIENT}██║   ██║{MC.BLUE_GRADIENT}██║  ╚══██╔══╝{MC.GREEN_GRADIENT}██║██╔════╝{MC.ORANGE_GRADIENT}██║     {MC.PINK_GRADIENT}██╔═══██╗{MC.YELLOW_GRADIENT}██║    ██║{MC.RESET}",
+        f"{MC.PURPLE_GRADIENT}██╔████╔██║{MC.CYAN_GRADIENT}██║   ██║{MC.BLUE_GRADIENT}██║     ██║   {MC.GREEN_GRADIENT}██║█████╗  {MC.ORANGE_GRADIENT}██║     {MC.PINK_GRADIENT}██║   ██║{MC.YELLOW_GRADIENT}██║ █╗ ██║{MC.RESET}",
+        f"{MC.PURPLE_DARK}██║╚██╔╝██║{MC.CYAN_DARK}██║   ██║{MC.BLUE_DARK}██║     ██║   {MC.GREEN_DARK}██║██╔══╝  {MC.ORANGE_DARK}██║     {MC.RED_GRADIENT}██║   ██║{MC.YELLOW_DARK}██║███╗██║{MC.RESET}",
+        f"{MC.PURPLE_DARK}██║ ╚═╝ ██║{MC.CYAN_DARK}╚██████╔╝{MC.BLUE_DARK}███████╗██║   {MC.GREEN_DARK}██║██║     {MC.ORANGE_DARK}███████╗{MC.RED_DARK}╚██████╔╝{MC.YELLOW_DARK}╚███╔███╔╝{MC.RESET}",
+        f"{MC.DARK_GRAY}╚═╝     ╚═╝ ╚═════╝ ╚══════╝╚═╝   ╚═╝╚═╝     ╚══════╝ ╚═════╝  ╚══╝╚══╝{MC.RESET}"
+    ]
+    _LOGO_BLOCK = "".join("  " + l + "\n" for l in _LOGO_LINES)  # Logo com indentação
+    _header_cache = {}  # Cabeçalho pronto por largura do terminal
+
     # Função para cabeçalho moderno com logo
     def modern_header():
         cols, _ = TerminalManager.size()  # Obtém largura
         width = max(60, min(cols - 2, 100))  # Ajusta largura
+        cached = _header_cache.get(width)
+        if cached is not None:
+            return cached  # Mesmo tamanho: reaproveita o cabeçalho
         s = []  # Lista de strings
         s.append(gradient_line(width))  # Adiciona linha gradiente
-        # Linhas do logo colorido
-        # Constrói as linhas do logo como strings únicas para evitar quebras indesejadas.
-        logo_lines = [
-            f"{MC.PURPLE_LIGHT}███╗   ███╗{MC.CYAN_LIGHT}██╗   ██╗{MC.BLUE_LIGHT}██╗  ████████╗{MC.GREEN_LIGHT}██╗███████╗{MC.ORANGE_LIGHT}██╗      {MC.PINK_LIGHT}██████╗ {MC.YELLOW_LIGHT}██╗    ██╗{MC.RESET}",
-            f"{MC.PURPLE_GRADIENT}████╗ ████║{MC.CYAN_GRADIENT}██║   ██║{MC.BLUE_GRADIENT}██║  ╚══██╔══╝{MC.GREEN_GRADIENT}██║██╔════╝{MC.ORANGE_GRADIENT}██║     {MC.PINK_GRADIENT}██╔═══██╗{MC.YELLOW_GRADIENT}██║    ██║{MC.RESET}",
-            f"{MC.PURPLE_GRADIENT}██╔████╔██║{MC.CYAN_GRADIENT}██║   ██║{MC.BLUE_GRADIENT}██║     ██║   {MC.GREEN_GRADIENT}██║█████╗  {MC.ORANGE_GRADIENT}██║     {MC.PINK_GRADIENT}██║   ██║{MC.YELLOW_GRADIENT}██║ █╗ ██║{MC.RESET}",
-            f"{MC.PURPLE_DARK}██║╚██╔╝██║{MC.CYAN_DARK}██║   ██║{MC.BLUE_DARK}██║     ██║   {MC.GREEN_DARK}██║██╔══╝  {MC.ORANGE_DARK}██║     {MC.RED_GRADIENT}██║   ██║{MC.YELLOW_DARK}██║███╗██║{MC.RESET}",
-            f"{MC.PURPLE_DARK}██║ ╚═╝ ██║{MC.CYAN_DARK}╚██████╔╝{MC.BLUE_DARK}███████╗██║   {MC.GREEN_DARK}██║██║     {MC.ORANGE_DARK}███████╗{MC.RED_DARK}╚██████╔╝{MC.YELLOW_DARK}╚███╔███╔╝{MC.RESET}",
-            f"{MC.DARK_GRAY}╚═╝     ╚═╝ ╚═════╝ ╚══════╝╚═╝   ╚═╝╚═╝     ╚══════╝ ╚═════╝  ╚══╝╚══╝{MC.RESET}"
-        ]
-        s.extend(["  " + l + "\n" for l in logo_lines])  # Adiciona logo com 
-        # indentação
+        s.append(_LOGO_BLOCK)  # Adiciona logo
         s.append(f"\n{MC.GRAY}{'═' * width}{MC.RESET}\n")  # Linha separadora
         # Título centralizado da aplicação
         s.append(f"{MC.CYAN_GRADIENT}{MC.BOLD}{'Sistema Avançado de Gerenciamento VPS'.center(width)}{MC.RESET}\n")
         # Outra linha separadora
         s.append(f"{MC.GRAY}{'═' * width}{MC.RESET}\n\n")
-        return "".join(s)  # Retorna cabeçalho completo
+        header = _header_cache[width] = "".join(s)
+        return header  # Retorna cabeçalho completo
 
     # Função para criar caixa moderna
     def modern_box(title, content_lines, icon="", primary=MC.CYAN_GRADIENT, 
@@ -360,10 +370,15 @@ if True:
         )
         body = ""  # Corpo da caixa
         for line in content_lines:
-            clean = re.sub(r'\033\[[0-9;]*m', '', line)  # Remove códigos de cor
-            # para cálculo de comprimento
-            pad = width - len(clean) - 2  # Padding necessário
+            # Comprimento visível: desconta os códigos de cor sem montar a
+            # string limpa (só é preciso se a linha for truncada)
+            if '\x1b' in line:
+                visible = len(line) - sum(m.end() - m.start() for m in _ANSI_SGR_RE.finditer(line))
+            else:
+                visible = len(line)
+            pad = width - visible - 2  # Padding necessário
             if pad < 0:
+                clean = _ANSI_SGR_RE.sub('', line) if '\x1b' in line else line
                 vis = clean[:width - 5] + "..."  # Trunca se muito longo
                 line = line.replace(clean, vis)
                 pad = width - len(vis) - 2
@@ -413,32 +428,66 @@ if True:
     # ==================== INFO DO SISTEMA ====================
     # Funções para obter informações do sistema.
 
+    _psutil = None  # psutil carregado sob demanda (extensão C + sondagem de /proc)
+
+    # Função que importa o psutil só quando o painel precisa dele
+    def _ps():
+        global _psutil
+        if _psutil is None:
+            import psutil  # Para monitoramento de recursos do sistema (CPU, RAM)
+            _psutil = psutil
+        return _psutil
+
+    _CPU_PRIME_INTERVAL = 0.10  # Espera só da primeira amostra de CPU (base)
+    _cpu_primed = False  # True após a primeira amostra
+
     # Função para monitorar uso de recursos
-    def monitorar_uso_recursos(intervalo_cpu=0.10):
+    def monitorar_uso_recursos(intervalo_cpu=None):
+        global _cpu_primed
         try:
+            psutil = _ps()
             ram = psutil.virtual_memory()  # Obtém uso de RAM
+            # Sem intervalo explícito: a primeira chamada espera um pouco para
+            # ter base; as seguintes usam interval=None (média desde a chamada
+            # anterior, sem bloquear)
+            if intervalo_cpu is None and not _cpu_primed:
+                intervalo_cpu = _CPU_PRIME_INTERVAL
             cpu_percent = psutil.cpu_percent(interval=intervalo_cpu)  # Obtém 
             # uso de CPU
+            _cpu_primed = True
             return {'ram_percent': ram.percent, 'cpu_percent': cpu_percent}  # 
             # Retorna dicionário
         except Exception:
             return {'ram_percent': 0, 'cpu_percent': 0}  # Retorna zeros em erro
 
+    # Função para ler o nome do sistema em /etc/os-release
+    def _read_os_name():
+        try:
+            with open('/etc/os-release', 'r') as f:
+                pairs = [line.strip().split('=', 1) for line in f if '=' in 
+                line]  # Parseia arquivo
+        except OSError:
+            return "Desconhecido"  # Arquivo ausente ou ilegível
+        return dict(pairs).get('PRETTY_NAME', 'Linux').strip('"')  # Nome do OS
+
+    _OS_NAME = _read_os_name()  # Não muda durante o boot: lido uma vez
+    _SYS_INFO_TTL = 2.0  # Segundos em que o painel reaproveita a última leitura
+    _sys_info_cache = {"t": 0.0, "data": None}  # Última leitura e quando foi feita
+
     # Função para obter info do sistema
     def get_system_info():
-        info = {"os_name": "Desconhecido", "ram_percent": 0, "cpu_percent": 0}  
+        now = time.monotonic()
+        # Redesenhos seguidos reaproveitam a amostra (evita nova espera da CPU)
+        if _sys_info_cache["data"] is not None and now - _sys_info_cache["t"] < _SYS_INFO_TTL:
+            return _sys_info_cache["data"]
+        info = {"os_name": _OS_NAME, "ram_percent": 0, "cpu_percent": 0}  
         # Info padrão
         try:
-            if os.path.exists('/etc/os-release'):
-                with open('/etc/os-release', 'r') as f:
-                    pairs = [line.strip().split('=', 1) for line in f if '=' in 
-                    line]  # Parseia arquivo
-                os_info = dict(pairs)
-                info["os_name"] = os_info.get('PRETTY_NAME', 'Linux').strip('"')
-        # Nome do OS
             info.update(monitorar_uso_recursos())  # Atualiza com recursos
         except Exception:
             pass  # Ignora erros
+        _sys_info_cache["t"] = now  # Guarda para os próximos redesenhos
+        _sys_info_cache["data"] = info
         return info  # Retorna info
 
     # Função para obter uptime do sistema
@@ -455,16 +504,32 @@ if True:
         except Exception:
             return "N/A"  # Não disponível
 
+    # Função para consultar várias unidades systemd num único `systemctl is-active`
+    def _active_units(units):
+        try:
+            r = subprocess.run(["systemctl", "is-active", *units],
+            capture_output=True, text=True)
+        except Exception:
+            return set()  # systemctl indisponível
+        # Uma linha por unidade, na ordem pedida (código de saída != 0 se alguma parada)
+        states = r.stdout.split()
+        return {u for u, st in zip(units, states) if st == "active"}
+
     # Função para obter serviços ativos
+    _services_cache = {"t": 0.0, "data": None}  # Última lista de serviços e quando foi feita
+
     def get_active_services():
+        now = time.monotonic()
+        # Mesmo TTL do painel: as consultas não se repetem a cada redesenho
+        if _services_cache["data"] is not None and now - _services_cache["t"] < _SYS_INFO_TTL:
+            return _services_cache["data"]
         services = []  # Lista de serviços
-        def run_cmd(cmd):
-            try:
-                return subprocess.check_output(cmd, text=True, 
-                stderr=subprocess.DEVNULL).strip()  # Executa comando
-            except Exception:
-                return ""  # Retorna vazio em erro
-        swapon = run_cmd(['swapon', '--show'])  # Verifica swap
+        # Lê /proc/swaps direto em vez de executar `swapon --show`
+        try:
+            with open('/proc/swaps') as f:
+                swapon = f.read()
+        except OSError:
+            swapon = ""
         if 'zram' in swapon:
             services.append(f"{MC.GREEN_GRADIENT}{Icons.ACTIVE} ZRAM{MC.RESET}")
         if '/swapfile' in swapon or 'partition' in swapon:
@@ -472,21 +537,16 @@ if True:
         if os.path.exists('/etc/openvpn/server.conf'):
             # Indica que o serviço OpenVPN está ativo
             services.append(f"{MC.CYAN_GRADIENT}{Icons.ACTIVE} OpenVPN{MC.RESET}")
-        try:
-            r = subprocess.run(["systemctl", "is-active", "badvpn-udpgw"], 
-            capture_output=True, text=True)
-            if r.returncode == 0 and r.stdout.strip() == "active":
-                # Indica que o serviço BadVPN está ativo
-                services.append(f"{MC.PURPLE_GRADIENT}{Icons.ACTIVE} BadVPN{MC.RESET}")
-        except Exception:
-            pass
-        try:
-            r = subprocess.run(["systemctl", "is-active", "ssh"], capture_output=True, text=True)
-            if r.returncode == 0 and r.stdout.strip() == "active":
-                # Indica que o serviço SSH está ativo
-                services.append(f"{MC.ORANGE_GRADIENT}{Icons.ACTIVE} SSH{MC.RESET}")
-        except Exception:
-            pass
+        # Um só `systemctl is-active` para as duas unidades, no lugar de dois
+        active = _active_units(("badvpn-udpgw", "ssh"))
+        if "badvpn-udpgw" in active:
+            # Indica que o serviço BadVPN está ativo
+            services.append(f"{MC.PURPLE_GRADIENT}{Icons.ACTIVE} BadVPN{MC.RESET}")
+        if "ssh" in active:
+            # Indica que o serviço SSH está ativo
+            services.append(f"{MC.ORANGE_GRADIENT}{Icons.ACTIVE} SSH{MC.RESET}")
+        _services_cache["t"] = now  # Guarda para os próximos redesenhos
+        _services_cache["data"] = services
         return services  # Retorna lista
 
     # Função para painel do sistema
@@ -507,11 +567,12 @@ if True:
             f"{MC.CYAN_LIGHT}Uptime:{MC.RESET} {MC.WHITE}{uptime}{MC.RESET}",
         ]
         if services:
-            line1 = f"{MC.CYAN_LIGHT}Serviços:{MC.RESET} " + " │ ".join(services[:4])  # Primeira linha de serviços
-            content.append(line1)
-            if len(services) > 4:
-                content.append(" " * 13 + " │ ".join(services[4:8]))  # Segunda 
-                # linha se necessário
+            # Até 4 serviços por linha, no máximo duas linhas; a segunda é
+            # alinhada sob a primeira
+            prefix = f"{MC.CYAN_LIGHT}Serviços:{MC.RESET} "
+            for i in range(0, min(len(services), 8), 4):
+                content.append(prefix + " │ ".join(services[i:i + 4]))
+                prefix = " " * 13
         else:
             # Nenhum serviço ativo
             content.append(f"{MC.CYAN_LIGHT}Serviços:{MC.RESET} {MC.GRAY}Nenhum serviço ativo{MC.RESET}")
@@ -816,10 +877,7 @@ if True:
     def otimizadorvps_menu():
         TerminalManager.leave_alt_screen()  # Sai da tela
         try:
-            script_real_path = os.path.realpath(__file__)  # Caminho real do 
-            # script
-            script_dir = os.path.dirname(script_real_path)  # Diretório
-            otimizador_path = os.path.join(script_dir, 'ferramentas', 
+            otimizador_path = os.path.join(_SCRIPT_DIR, 'ferramentas', 
             'otimizadorvps.py')  # Caminho do otimizador
             subprocess.run([sys.executable, otimizador_path], check=True)  # 
             # Executa
@@ -866,9 +924,8 @@ if True:
 
         if confirm == 's':
             try:
-                script_dir = os.path.dirname(os.path.realpath(__file__))  # Diretório
                 # Define o caminho do script de update diretamente na pasta ferramentas
-                update_script_path = os.path.join(script_dir, 'ferramentas', 'update.py')
+                update_script_path = os.path.join(_SCRIPT_DIR, 'ferramentas', 'update.py')
                 if not os.path.exists(update_script_path):
                     # Exibe mensagens de erro caso o script de update não seja encontrado, combinando as mensagens para evitar redundância
                     error_msg = (